@@ -55,6 +55,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third-party apps
     'rest_framework',
@@ -137,6 +138,37 @@ DATABASES = {
 }
 
 
+# Cache
+# Shared between processes when REDIS_URL is set, per-process otherwise
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'newsdebate',
+        }
+    }
+
+# Build request.user from JWT claims (users/authentication.py) only with a
+# shared cache: stale claims are revoked by bumping a cache generation, which
+# a per-process cache would only see in the process that made the change
+JWT_CLAIMS_AUTH = bool(os.getenv('REDIS_URL'))
+
+# Article API response cache (seconds). Entries are invalidated by generation
+# bumps on writes; the timeout only bounds time-dependent payloads and memory.
+# Only with a shared cache: ingestion, rescoring and reconciling run in their
+# own processes, and a per-process cache would never see their bumps.
+API_CACHE_ENABLED = bool(os.getenv('REDIS_URL'))
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', '300'))
+API_CACHE_STATS_TIMEOUT = 60  # last_7_days is a rolling window
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -175,6 +207,53 @@ load_dotenv()
 
 # NewsAPI settings
 NEWS_API_KEY = os.getenv('NEWS_API_KEY')
+NEWS_API_BASE_URL = os.getenv('NEWS_API_BASE_URL', 'https://newsapi.org/v2')
+NEWS_API_RATE_LIMIT = 5  # Max requests per second per host for concurrent fetches
+
+# Outbound HTTP connection pools (see news/http.py for defaults)
+HTTP_POOLS = {
+    'newsapi': {
+        'pool_maxsize': int(os.getenv('NEWSAPI_POOL_SIZE', '10')),
+        'read_timeout': 10,
+    },
+    'ml': {
+        'pool_maxsize': int(os.getenv('ML_POOL_SIZE', '10')),
+        'read_timeout': 30,
+    },
+}
+
+# ML bias prediction service
+ML_BATCH_SIZE = int(os.getenv('ML_BATCH_SIZE', '16'))  # Articles per /predict/batch call
+ML_MODEL_VERSION = os.getenv('ML_MODEL_VERSION', 'v1')  # Part of the prediction cache key
+ML_MAX_BATCH_TIMEOUT = 60  # Read timeout cap for one /predict/batch call (seconds)
+ML_CIRCUIT_BREAKER = {
+    'failure_threshold': 5,  # Consecutive failures before the circuit opens
+    'reset_timeout': 30,  # First probe after 30s, doubling on each failed probe
+    'max_reset_timeout': 900,
+}
+ML_PREDICTION_CACHE = {
+    'max_size': 2048,  # In-process LRU entries
+    'ttl': 60 * 60 * 24 * 7,  # Shared cache TTL (7 days)
+}
+
+# Write-behind buffer for hot counters. Deltas live in the cache until
+# flush_counters (its own process) writes them, so it needs the shared cache
+# (REDIS_URL) - with a per-process cache the flush would never see them.
+# - ad_events: ad impressions / clicks, on by default
+# - enabled: upvote and comment counters too (reconcile_counters refuses to run)
+COUNTER_BUFFER = {
+    'enabled': bool(os.getenv('REDIS_URL')) and os.getenv('COUNTER_BUFFER_ENABLED', 'False') == 'True',
+    'ad_events': bool(os.getenv('REDIS_URL')) and os.getenv('AD_EVENT_BUFFER_ENABLED', 'True') == 'True',
+}
+
+# Seconds a user's premium expiry stays cached (users/utils.py PremiumService)
+PREMIUM_CACHE_TIMEOUT = 60 * 60
+
+# In-process snapshot of active ads served by /api/ads/random/
+AD_SELECTOR = {
+    'ttl': 60,  # Seconds before the snapshot is reloaded
+    'check_interval': 5,  # Seconds between checks for admin changes
+}
 
 # Create logs directory if it doesn't exist
 LOGS_DIR = os.path.join(BASE_DIR, 'logs')
@@ -270,6 +349,11 @@ SIMPLE_JWT = {
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
     
+    # Tokens carry email / premium / staff claims (users/tokens.py), so
+    # ClaimsJWTAuthentication can skip the per-request User query
+    'TOKEN_OBTAIN_SERIALIZER': 'users.tokens.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.tokens.ClaimsTokenRefreshSerializer',
+    
     'JTI_CLAIM': 'jti',
 }
 
@@ -277,7 +361,7 @@ SIMPLE_JWT = {
 REST_FRAMEWORK = {
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -1,7 +1,4 @@
-
 GREEN='\033[0;32m'
-YELLOW='\033[1;33m'
-BLUE='\033[0;34m'
 NC='\033[0m' # No Color
 
 echo "========================================"
@@ -11,13 +8,7 @@ echo "   Press Ctrl+C to stop"
 echo "========================================"
 echo
 
-while true; do
-    echo -e "${BLUE}[$(date '+%Y-%m-%d %H:%M:%S')]${NC} Fetching 50 articles..."
-    
-    python manage.py fetch_news --count 50
-    
-    echo -e "${GREEN}[$(date '+%Y-%m-%d %H:%M:%S')]${NC} Done. Waiting 1 hour..."
-    echo
-    
-    sleep 3600  # 1 hour = 3600 seconds
-done
\ No newline at end of file
+# The scheduling loop lives in the run_ingestor command now:
+# one warm process, graceful shutdown, single-replica lock.
+echo -e "${GREEN}[$(date '+%Y-%m-%d %H:%M:%S')]${NC} Starting ingestor..."
+exec python manage.py run_ingestor --count 50 --interval 3600
@@ -9,13 +9,6 @@ echo    Press Ctrl+C to stop
 echo ========================================
 echo.
 
-:loop
-echo [%date% %time%] Fetching 50 articles...
+echo [%date% %time%] Starting ingestor...
 
-C:\Users\User\OneDrive\Desktop\NewsDebate\venv\Scripts\python.exe C:\Users\User\OneDrive\Desktop\NewsDebate\manage.py fetch_news --count 50
-
-echo [%date% %time%] Done. Waiting 1 hour...
-echo.
-
-timeout /t 3600 /nobreak >nul
-goto loop
\ No newline at end of file
+C:\Users\User\OneDrive\Desktop\NewsDebate\venv\Scripts\python.exe C:\Users\User\OneDrive\Desktop\NewsDebate\manage.py run_ingestor --count 50 --interval 3600
\ No newline at end of file
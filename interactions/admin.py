@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Upvote, Comment, Ad
+from .models import Upvote, Comment, Ad, AdHourlyStat
+from .ads import ad_selector
 
 @admin.register(Upvote)
 class UpvoteAdmin(admin.ModelAdmin):
@@ -48,4 +49,25 @@ class AdAdmin(admin.ModelAdmin):
         ('Settings', {
             'fields': ('is_active', 'priority')
         }),
-    )
\ No newline at end of file
+    )
+    
+    # Serving reads an in-process snapshot of the active ads - refresh it
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        ad_selector.invalidate()
+    
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        ad_selector.invalidate()
+    
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        ad_selector.invalidate()
+
+@admin.register(AdHourlyStat)
+class AdHourlyStatAdmin(admin.ModelAdmin):
+    list_display = ['ad', 'hour', 'impressions', 'clicks']
+    list_filter = ['ad']
+    date_hierarchy = 'hour'
+    raw_id_fields = ['ad']
+    readonly_fields = ['impressions', 'clicks']
@@ -0,0 +1,156 @@
+import bisect
+import logging
+import random
+import threading
+import time
+from datetime import timezone as dt_timezone
+from django.conf import settings
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDay
+from django.utils import timezone
+
+from news.caching import bump, get_generations
+from .counters import increment_counter
+from .models import Ad, AdHourlyStat
+from .serializers import AdSerializer
+
+logger = logging.getLogger(__name__)
+
+# Generation bumped whenever the set of servable ads changes
+ADS = 'ads'
+
+
+def ad_weight(priority):
+    """Selection weight of an ad: priority 0 is weight 1, negative priorities never win over 0"""
+    return max(priority, 0) + 1
+
+
+class AdSelector:
+    """
+    In-process snapshot of the active ads for weighted random selection
+    
+    The snapshot holds each ad's serialized data and a cumulative-weight
+    array, so pick() is a bisect over it - no database query and no
+    serialization on the serving path. It is rebuilt after ttl seconds, or
+    when the shared ADS generation moves (checked at most every
+    check_interval seconds, so an admin edit reaches every process quickly).
+    """
+    
+    def __init__(self, ttl=60, check_interval=5):
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._ads = []
+        self._cumulative = []
+        self._by_id = {}
+        self._generation = None
+        self._loaded_at = None
+        self._checked_at = None
+    
+    def load(self):
+        """Read the active ads and rebuild the snapshot"""
+        ads = list(Ad.objects.filter(is_active=True).order_by('id'))
+        cumulative = []
+        total = 0
+        for ad in ads:
+            total += ad_weight(ad.priority)
+            cumulative.append(total)
+        return AdSerializer(ads, many=True).data, cumulative
+    
+    def snapshot(self):
+        """Return (ads, cumulative_weights), refreshing them when stale"""
+        now = time.monotonic()
+        with self._lock:
+            fresh = self._loaded_at is not None and now - self._loaded_at < self.ttl
+            if fresh and now - self._checked_at < self.check_interval:
+                return self._ads, self._cumulative
+        
+        generation = get_generations([ADS])[ADS]
+        with self._lock:
+            if fresh and generation == self._generation:
+                self._checked_at = now
+                return self._ads, self._cumulative
+        
+        ads, cumulative = self.load()
+        with self._lock:
+            self._ads, self._cumulative = ads, cumulative
+            self._by_id = {ad['id']: ad for ad in ads}
+            self._generation = generation
+            self._loaded_at = self._checked_at = now
+        logger.info(f"Ad snapshot loaded: {len(ads)} active ad(s)")
+        return ads, cumulative
+    
+    def pick(self):
+        """Serialized data of one active ad chosen by priority weight, or None"""
+        ads, cumulative = self.snapshot()
+        if not ads:
+            return None
+        point = random.random() * cumulative[-1]
+        return ads[bisect.bisect_right(cumulative, point)]
+    
+    def get(self, ad_id):
+        """Serialized data of an active ad in the snapshot, or None"""
+        self.snapshot()
+        with self._lock:
+            return self._by_id.get(ad_id)
+    
+    def invalidate(self):
+        """Drop this process's snapshot now and every other one once the transaction commits"""
+        with self._lock:
+            self._loaded_at = None
+        bump(ADS)
+
+
+ad_selector = AdSelector(**getattr(settings, 'AD_SELECTOR', {}))
+
+
+def current_hour(now=None):
+    """Start of the current UTC hour - the AdHourlyStat bucket"""
+    return (now or timezone.now()).astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _record(ad_id, ad_field, rollup_field):
+    increment_counter(Ad, ad_field, ad_id, 1)
+    increment_counter(AdHourlyStat, rollup_field, AdHourlyStat.counter_key(ad_id, current_hour()), 1)
+
+
+def record_impression(ad_id):
+    """Count one view of an ad, lifetime and hourly - buffered when COUNTER_BUFFER is enabled"""
+    _record(ad_id, 'view_count', 'impressions')
+
+
+def record_click(ad_id):
+    """Count one click on an ad, lifetime and hourly - buffered when COUNTER_BUFFER is enabled"""
+    _record(ad_id, 'click_count', 'clicks')
+
+
+def click_through_rate(impressions, clicks):
+    """CTR in percent, rounded like the performance report"""
+    return round(clicks / impressions * 100, 2) if impressions else 0
+
+
+def performance_series(start, end, granularity='hour'):
+    """
+    Impressions, clicks and CTR per ad per hour or day in [start, end)
+    
+    One range scan over the hourly rollups, summed per bucket in the
+    database. Returns {ad_id: [{bucket, impressions, clicks, ctr}, ...]}
+    ordered by bucket. Buffered events appear once they are flushed.
+    """
+    bucket = F('hour') if granularity == 'hour' else TruncDay('hour', tzinfo=dt_timezone.utc)
+    rows = AdHourlyStat.objects.filter(
+        hour__gte=start, hour__lt=end
+    ).annotate(bucket=bucket).values('ad_id', 'bucket').annotate(
+        impressions=Sum('impressions'),
+        clicks=Sum('clicks'),
+    ).order_by('ad_id', 'bucket')
+    
+    series = {}
+    for row in rows:
+        series.setdefault(row['ad_id'], []).append({
+            'bucket': row['bucket'],
+            'impressions': row['impressions'],
+            'clicks': row['clicks'],
+            'ctr': click_through_rate(row['impressions'], row['clicks']),
+        })
+    return series
@@ -0,0 +1,253 @@
+import logging
+from functools import partial
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+
+from news.models import Article
+from .models import Comment, Upvote
+
+logger = logging.getLogger(__name__)
+
+
+class CounterBuffer:
+    """
+    Write-behind buffer for hot counters
+
+    - add() accumulates a delta in the cache with an atomic incr()
+    - flush() moves every pending delta to the database, one UPDATE per
+      (model, field)
+    - current() / pending() merge the durable value with what is buffered
+
+    enabled buffers every counter; ad_events only the ad impression and
+    click counters (Ad and AdHourlyStat).
+
+    The cache API has no sets, so dirty counters are tracked in a journal:
+    whenever a delta key leaves zero its name is written under the next
+    sequence number, and flush() walks the journal from where it stopped.
+    """
+    key_prefix = 'counters'
+    ad_event_models = ('interactions.ad', 'interactions.adhourlystat')
+
+    def __init__(self, enabled=False, ad_events=False):
+        self.enabled = enabled
+        self.ad_events = ad_events
+        self.seq_key = f"{self.key_prefix}:seq"
+        self.flushed_key = f"{self.key_prefix}:flushed"
+        self.stalled_key = f"{self.key_prefix}:stalled"
+        self.lock_key = f"{self.key_prefix}:flush_lock"
+
+    def buffers(self, model):
+        """True if changes to this model's counters are buffered"""
+        return self.enabled or (self.ad_events and model._meta.label_lower in self.ad_event_models)
+
+    def delta_key(self, model, field, pk):
+        return f"{self.key_prefix}:delta:{model._meta.label_lower}:{field}:{pk}"
+
+    def journal_key(self, seq):
+        return f"{self.key_prefix}:journal:{seq}"
+
+    def add(self, model, field, pk, delta):
+        """Buffer a counter change"""
+        key = self.delta_key(model, field, pk)
+        cache.add(key, 0, timeout=None)
+        if cache.incr(key, delta) == delta:
+            # Was zero: nothing in the journal points at this counter yet
+            self._journal(key)
+
+    def _journal(self, key):
+        cache.add(self.seq_key, 0, timeout=None)
+        seq = cache.incr(self.seq_key)
+        cache.set(self.journal_key(seq), key, timeout=None)
+
+    def pending(self, model, field, pks):
+        """{pk: buffered delta} for the given objects"""
+        keys = {self.delta_key(model, field, pk): pk for pk in pks}
+        return {keys[key]: delta for key, delta in cache.get_many(list(keys)).items() if delta}
+
+    def current(self, instance, field):
+        """Durable value plus the buffered delta"""
+        value = getattr(instance, field)
+        if not self.buffers(type(instance)):
+            return value
+        return max(value + self.pending(type(instance), field, [instance.pk]).get(instance.pk, 0), 0)
+
+    def flush(self):
+        """
+        Write pending deltas to the database. Returns the number of counters
+        written, or None if another process is already flushing.
+        """
+        if not cache.add(self.lock_key, 1, timeout=300):
+            return None
+        try:
+            return self._flush()
+        finally:
+            cache.delete(self.lock_key)
+
+    def _flush(self):
+        flushed = cache.get(self.flushed_key, 0)
+        head = cache.get(self.seq_key, 0)
+        seqs = list(range(flushed + 1, head + 1))
+        entries = cache.get_many([self.journal_key(seq) for seq in seqs])
+
+        keys = []
+        last = flushed
+        for seq in seqs:
+            entry = entries.get(self.journal_key(seq))
+            if entry is None:
+                # A writer took this number but has not written it yet. Wait
+                # one flush for it, then assume the writer died and move on.
+                if cache.get(self.stalled_key) != seq:
+                    cache.set(self.stalled_key, seq, timeout=None)
+                    break
+            else:
+                keys.append(entry)
+            last = seq
+
+        # Take each delta: decr() by what we read keeps concurrent increments
+        deltas = {}
+        for key in dict.fromkeys(keys):
+            value = cache.get(key)
+            if not value:
+                continue
+            try:
+                remaining = cache.decr(key, value)
+            except ValueError:
+                continue  # evicted between get and decr
+            deltas[key] = value
+            if remaining:
+                self._journal(key)
+
+        try:
+            self._apply(deltas)
+        except Exception:
+            # Put the deltas back so the next flush retries them
+            for key, value in deltas.items():
+                cache.add(key, 0, timeout=None)
+                cache.incr(key, value)
+                self._journal(key)
+            raise
+
+        cache.set(self.flushed_key, last, timeout=None)
+        cache.delete_many([self.journal_key(seq) for seq in seqs if seq <= last])
+        return len(deltas)
+
+    def _apply(self, deltas):
+        grouped = {}
+        for key, delta in deltas.items():
+            label, field, pk = key.split(':')[2:]
+            grouped.setdefault((label, field), {})[pk] = delta
+
+        with transaction.atomic():
+            for (label, field), changes in grouped.items():
+                model = apps.get_model(label)
+                if hasattr(model, 'apply_counter_deltas'):
+                    # Rollup rows keyed by something other than the pk
+                    model.apply_counter_deltas(field, changes)
+                    logger.info(f"Flushed {len(changes)} {label}.{field} counter(s)")
+                    continue
+                changes = {int(pk): delta for pk, delta in changes.items()}
+                change = Case(
+                    *[When(pk=pk, then=Value(delta)) for pk, delta in changes.items()],
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+                model.objects.filter(pk__in=list(changes)).update(
+                    **{field: Greatest(F(field) + change, 0)}
+                )
+                logger.info(f"Flushed {len(changes)} {label}.{field} counter(s)")
+
+
+counter_buffer = CounterBuffer(**getattr(settings, 'COUNTER_BUFFER', {}))
+
+
+def increment_counter(model, field, pk, delta):
+    """
+    Move a counter by delta: buffered after commit when the write-behind
+    buffer covers the model, otherwise an atomic F() update in the current
+    transaction
+
+    Rollup models take their own counter ids instead of a pk, and apply them
+    with apply_counter_deltas() (flush) and add_counter_delta() (unbuffered).
+    """
+    if counter_buffer.buffers(model):
+        transaction.on_commit(partial(counter_buffer.add, model, field, pk, delta))
+    elif hasattr(model, 'add_counter_delta'):
+        model.add_counter_delta(field, pk, delta)
+    else:
+        model.objects.filter(pk=pk).update(**{field: Greatest(F(field) + delta, 0)})
+
+
+def toggle_article_upvote(user, article):
+    """
+    Add or remove the user's upvote in one transaction
+
+    upvote_count moves by exactly the number of Upvote rows inserted or
+    deleted, with an atomic F() update, so concurrent toggles never write a
+    stale total. Returns (upvoted, upvote_count).
+    """
+    with transaction.atomic():
+        deleted, _ = Upvote.objects.filter(user=user, article=article).delete()
+        if deleted:
+            upvoted, delta = False, -1
+        else:
+            try:
+                with transaction.atomic():
+                    Upvote.objects.create(user=user, article=article)
+                upvoted, delta = True, 1
+            except IntegrityError:
+                # A concurrent request from the same user inserted it first
+                upvoted, delta = True, 0
+
+        if delta:
+            increment_counter(Article, 'upvote_count', article.pk, delta)
+        # Unbuffered, we hold the row lock from the update, so this is our exact total
+        article.refresh_from_db(fields=['upvote_count'])
+
+    return upvoted, counter_buffer.current(article, 'upvote_count')
+
+
+def _reconcile(field, actual_counts, batch_size):
+    """
+    Recount one Article counter in batches. Each batch locks its articles
+    first, so a write in flight either finishes before the recount or
+    applies its delta on top of it. Returns the corrected article ids.
+    Buffered deltas are not covered - see reconcile_counters.
+    """
+    corrected = []
+    article_ids = list(Article.objects.order_by('id').values_list('id', flat=True))
+
+    for start in range(0, len(article_ids), batch_size):
+        chunk = article_ids[start:start + batch_size]
+        with transaction.atomic():
+            stored = dict(
+                Article.objects.select_for_update()
+                .filter(id__in=chunk).order_by('id')
+                .values_list('id', field)
+            )
+            actual = dict(
+                actual_counts.filter(article_id__in=chunk).order_by()
+                .values('article_id').annotate(count=Count('id'))
+                .values_list('article_id', 'count')
+            )
+            for article_id, value in stored.items():
+                count = actual.get(article_id, 0)
+                if value != count:
+                    Article.objects.filter(id=article_id).update(**{field: count})
+                    logger.warning(f"Article {article_id} {field} drifted: {value} -> {count}")
+                    corrected.append(article_id)
+
+    return corrected
+
+
+def reconcile_upvote_counts(batch_size=1000):
+    """Repair drift between Article.upvote_count and the Upvote rows"""
+    return _reconcile('upvote_count', Upvote.objects.all(), batch_size)
+
+
+def reconcile_comment_counts(batch_size=1000):
+    """Repair drift between Article.comment_count and the active Comment rows"""
+    return _reconcile('comment_count', Comment.objects.filter(is_active=True), batch_size)
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from interactions.counters import counter_buffer
+import logging
+import signal
+import threading
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Write buffered upvote/comment/ad counters to the database (COUNTER_BUFFER)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=0,
+            help='Keep running and flush every N seconds (default: flush once and exit)'
+        )
+    
+    def handle(self, *args, **options):
+        if not (counter_buffer.enabled or counter_buffer.ad_events):
+            self.stdout.write(self.style.WARNING("⚠️ COUNTER_BUFFER is disabled - flushing anything left over"))
+        
+        interval = options['interval']
+        if not interval:
+            self.flush()
+            return
+        
+        self.stop_event = threading.Event()
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+        
+        logger.info(f"FLUSH_COUNTERS STARTED - every {interval}s")
+        self.stdout.write(self.style.SUCCESS(f"💾 Flushing counters every {interval}s"))
+        while not self.stop_event.is_set():
+            self.flush()
+            self.stop_event.wait(interval)
+        
+        # Last flush so nothing is left behind on shutdown
+        self.flush()
+        logger.info("FLUSH_COUNTERS STOPPED")
+    
+    def flush(self):
+        try:
+            written = counter_buffer.flush()
+        except Exception as e:
+            logger.error(f"Counter flush failed: {e}")
+            self.stdout.write(self.style.ERROR(f"Flush failed: {e}"))
+            return
+        
+        if written is None:
+            self.stdout.write("⏸️ Another process is flushing")
+        elif written:
+            self.stdout.write(f" Flushed {written} counter(s)")
+    
+    def request_stop(self, signum, frame):
+        """Signal handler - flush once more, then exit"""
+        logger.info(f"Received signal {signum}, stopping after a final flush")
+        self.stop_event.set()
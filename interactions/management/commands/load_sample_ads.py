@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from interactions.models import Ad
+from interactions.ads import ad_selector
 
 class Command(BaseCommand):
     help = 'Load sample advertisements for the project'
@@ -52,4 +53,7 @@ class Command(BaseCommand):
             else:
                 self.stdout.write(f'Already exists: {ad.title}')
         
+        if created_count:
+            ad_selector.invalidate()
+        
         self.stdout.write(self.style.SUCCESS(f'\nSuccessfully loaded {created_count} new ads!'))
\ No newline at end of file
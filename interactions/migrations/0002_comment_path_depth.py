@@ -0,0 +1,52 @@
+from django.db import migrations, models
+
+
+def backfill_comment_paths(apps, schema_editor):
+    Comment = apps.get_model('interactions', 'Comment')
+    parents = dict(Comment.objects.values_list('id', 'parent_id'))
+    paths = {}
+    
+    def path_of(pk):
+        # Walk up to the first comment whose path is known (iteratively -
+        # threads can be deeper than the recursion limit)
+        chain = []
+        while pk is not None and pk not in paths:
+            chain.append(pk)
+            pk = parents.get(pk)
+        prefix, depth = paths.get(pk, ('', -1))
+        for node in reversed(chain):
+            depth += 1
+            prefix = f"{prefix}{node:012d}/"
+            paths[node] = (prefix, depth)
+        return paths[chain[0]] if chain else paths[pk]
+    
+    comments = []
+    for pk in parents:
+        path, depth = path_of(pk)
+        comments.append(Comment(id=pk, path=path, depth=depth))
+    Comment.objects.bulk_update(comments, ['path', 'depth'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.TextField(blank=True, db_collation='C', default='', editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['article', 'path'], name='interaction_article_31856c_idx'),
+        ),
+        migrations.RunPython(backfill_comment_paths, migrations.RunPython.noop),
+    ]
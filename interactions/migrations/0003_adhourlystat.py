@@ -0,0 +1,26 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('interactions', '0002_comment_path_depth'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdHourlyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(help_text='Start of the UTC hour')),
+                ('impressions', models.PositiveIntegerField(default=0)),
+                ('clicks', models.PositiveIntegerField(default=0)),
+                ('ad', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hourly_stats', to='interactions.ad')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hour'], name='interaction_hour_c313b9_idx')],
+                'unique_together': {('ad', 'hour')},
+            },
+        ),
+    ]
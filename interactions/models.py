@@ -1,4 +1,7 @@
-from django.db import models
+from datetime import datetime, timezone as dt_timezone
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.conf import settings
 from django.core.validators import MinLengthValidator, MaxLengthValidator
 from news.models import Article
@@ -27,6 +30,14 @@ class Upvote(models.Model):
     
     def __str__(self):
         return f"{self.user.email} ↑ {self.article.title[:30]}"
+    
+    @classmethod
+    def upvoted_article_ids(cls, user, article_ids):
+        """Which of article_ids the user has upvoted - one (user, article) index lookup"""
+        return set(
+            cls.objects.filter(user=user, article_id__in=article_ids)
+            .order_by().values_list('article_id', flat=True)
+        )
 
 
 class Comment(models.Model):
@@ -58,15 +69,39 @@ class Comment(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
     
+    # Materialized path: zero-padded ids from the thread root down to this
+    # comment ("000000000012/000000000045/"). Sorting by path yields the whole
+    # tree depth-first, so an article's threads load in one indexed query.
+    # "C" collation keeps the byte order the ranges and prefixes rely on.
+    path = models.TextField(blank=True, default='', editable=False, db_collation='C')
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+    
+    PATH_STEP_WIDTH = 12
+    
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['article', 'created_at']),
             models.Index(fields=['user', 'created_at']),
+            models.Index(fields=['article', 'path']),
         ]
     
     def __str__(self):
         return f"{self.user.email}: {self.content[:30]}..."
+    
+    @classmethod
+    def path_step(cls, pk):
+        return f"{pk:0{cls.PATH_STEP_WIDTH}d}/"
+    
+    def save(self, *args, **kwargs):
+        # The path needs our id, so new comments get it right after the insert
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if not self.path:
+                parent = self.parent
+                self.path = (parent.path if parent else '') + self.path_step(self.pk)
+                self.depth = parent.depth + 1 if parent else 0
+                Comment.objects.filter(pk=self.pk).update(path=self.path, depth=self.depth)
 
 
 class Ad(models.Model):
@@ -90,4 +125,79 @@ class Ad(models.Model):
         ordering = ['-priority', '-created_at']
     
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+
+class AdHourlyStat(models.Model):
+    """
+    Impressions and clicks per ad per UTC hour
+    
+    Filled by the ad event pipeline (interactions/ads.py), through the
+    counter buffer when COUNTER_BUFFER is enabled.
+    """
+    ad = models.ForeignKey(
+        Ad,
+        on_delete=models.CASCADE,
+        related_name='hourly_stats'
+    )
+    hour = models.DateTimeField(help_text="Start of the UTC hour")
+    impressions = models.PositiveIntegerField(default=0)
+    clicks = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['ad', 'hour']
+        indexes = [
+            models.Index(fields=['hour']),
+        ]
+    
+    def __str__(self):
+        return f"Ad {self.ad_id} @ {self.hour:%Y-%m-%d %H:00}: {self.impressions}/{self.clicks}"
+    
+    @staticmethod
+    def counter_key(ad_id, hour):
+        """Counter id of one (ad, hour) row - rows are created on first use"""
+        return f"{ad_id}.{hour.astimezone(dt_timezone.utc):%Y%m%d%H}"
+    
+    @staticmethod
+    def parse_counter_key(key):
+        ad_id, hour = str(key).split('.')
+        return int(ad_id), datetime.strptime(hour, '%Y%m%d%H').replace(tzinfo=dt_timezone.utc)
+    
+    @classmethod
+    def apply_counter_deltas(cls, field, changes):
+        """Add {counter_key: delta} to one field, creating missing rows"""
+        rows = {key: cls.parse_counter_key(key) for key in changes}
+        # Deltas can outlive a deleted ad
+        ad_ids = set(Ad.objects.filter(
+            id__in={ad_id for ad_id, _ in rows.values()}
+        ).values_list('id', flat=True))
+        rows = {key: row for key, row in rows.items() if row[0] in ad_ids}
+        
+        with transaction.atomic():
+            cls.objects.bulk_create(
+                [cls(ad_id=ad_id, hour=hour) for ad_id, hour in rows.values()],
+                ignore_conflicts=True,
+            )
+            for key, (ad_id, hour) in rows.items():
+                cls.objects.filter(ad_id=ad_id, hour=hour).update(
+                    **{field: Greatest(F(field) + changes[key], 0)}
+                )
+    
+    @classmethod
+    def add_counter_delta(cls, field, key, delta):
+        """
+        Add one unbuffered delta: an UPDATE, plus an INSERT only for the
+        hour's first event. The caller has already checked the ad against
+        the active ad snapshot, so the ad itself is not re-read.
+        """
+        ad_id, hour = cls.parse_counter_key(key)
+        rows = cls.objects.filter(ad_id=ad_id, hour=hour)
+        increment = {field: Greatest(F(field) + delta, 0)}
+        if rows.update(**increment):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(ad_id=ad_id, hour=hour, **{field: max(delta, 0)})
+        except IntegrityError:
+            # Another request created the row first
+            rows.update(**increment)
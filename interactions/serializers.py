@@ -32,9 +32,9 @@ class CommentSerializer(serializers.ModelSerializer):
         model = Comment
         fields = [
             'id', 'user', 'user_email', 'user_name', 'article',
-            'parent', 'content', 'created_at', 'updated_at', 'is_active'
+            'parent', 'depth', 'content', 'created_at', 'updated_at', 'is_active'
         ]
-        read_only_fields = ['id', 'user', 'created_at', 'updated_at', 'is_active']
+        read_only_fields = ['id', 'user', 'depth', 'created_at', 'updated_at', 'is_active']
     
     def get_user_name(self, obj):
         return obj.user.full_name or obj.user.get_short_name()
@@ -53,6 +53,9 @@ class CommentCreateSerializer(serializers.ModelSerializer):
     def validate_parent(self, value):
         if value and not Comment.objects.filter(id=value.id).exists():
             raise serializers.ValidationError("Parent comment does not exist")
+        # The reply's path extends the parent's, so it must be in the same thread tree
+        if value and value.article_id != self.context['article'].id:
+            raise serializers.ValidationError("Parent comment belongs to another article")
         return value
 
 class CommentUpdateSerializer(serializers.ModelSerializer):
@@ -1,3 +1,358 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.utils import timezone
+
+from news.models import Article
+from .ads import AdSelector, current_hour, performance_series, record_click, record_impression
+from .counters import CounterBuffer, reconcile_upvote_counts, toggle_article_upvote
+from .models import Ad, AdHourlyStat, Comment, Upvote
+from .serializers import CommentCreateSerializer
+from .threads import article_comment_page, comment_replies_page
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class UpvoteCounterTests(TransactionTestCase):
+    """Concurrent toggles must leave upvote_count equal to the Upvote rows"""
+    
+    users_count = 20
+    
+    def setUp(self):
+        self.article = Article.objects.create(
+            title='Concurrency', source_name='Test', url='https://example.com/concurrency',
+            published_at=timezone.now(),
+        )
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(email=f'user{i}@example.com')
+            for i in range(self.users_count)
+        ]
+    
+    def run_concurrently(self, toggles_per_user):
+        barrier = threading.Barrier(len(self.users))
+        errors = []
+        
+        def worker(user):
+            try:
+                barrier.wait()
+                for _ in range(toggles_per_user):
+                    toggle_article_upvote(user, Article.objects.get(pk=self.article.pk))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+        
+        threads = [threading.Thread(target=worker, args=(user,)) for user in self.users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+    
+    def assertCountExact(self, expected):
+        self.article.refresh_from_db()
+        self.assertEqual(Upvote.objects.filter(article=self.article).count(), expected)
+        self.assertEqual(self.article.upvote_count, expected)
+    
+    def test_concurrent_upvotes(self):
+        self.run_concurrently(toggles_per_user=1)
+        self.assertCountExact(self.users_count)
+    
+    def test_concurrent_toggles(self):
+        # Odd number of toggles per user - everyone ends up upvoted
+        self.run_concurrently(toggles_per_user=5)
+        self.assertCountExact(self.users_count)
+        
+        self.run_concurrently(toggles_per_user=1)
+        self.assertCountExact(0)
+    
+    def test_toggle_returns_count(self):
+        self.assertEqual(toggle_article_upvote(self.users[0], self.article), (True, 1))
+        self.assertEqual(toggle_article_upvote(self.users[1], self.article), (True, 2))
+        self.assertEqual(toggle_article_upvote(self.users[0], self.article), (False, 1))
+    
+    def test_reconcile_repairs_drift(self):
+        toggle_article_upvote(self.users[0], self.article)
+        Article.objects.filter(pk=self.article.pk).update(upvote_count=7)
+        
+        self.assertEqual(reconcile_upvote_counts(), [self.article.pk])
+        self.assertCountExact(1)
+        self.assertEqual(reconcile_upvote_counts(), [])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CounterBufferTests(TestCase):
+    """Write-behind counters on the local-memory cache"""
+    
+    def setUp(self):
+        self.buffer = CounterBuffer(enabled=True)
+        self.article = Article.objects.create(
+            title='Buffered', source_name='Test', url='https://example.com/buffered',
+            published_at=timezone.now(), upvote_count=10,
+        )
+        self.ad = Ad.objects.create(title='Ad', link_url='https://example.com/ad')
+    
+    def test_reads_merge_pending_deltas(self):
+        for _ in range(3):
+            self.buffer.add(Article, 'upvote_count', self.article.pk, 1)
+        self.buffer.add(Article, 'upvote_count', self.article.pk, -1)
+        
+        self.assertEqual(self.buffer.pending(Article, 'upvote_count', [self.article.pk]), {self.article.pk: 2})
+        self.assertEqual(self.buffer.current(self.article, 'upvote_count'), 12)
+        # Nothing written yet
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.upvote_count, 10)
+    
+    def test_flush_writes_and_clears(self):
+        for _ in range(5):
+            self.buffer.add(Article, 'upvote_count', self.article.pk, 1)
+        self.buffer.add(Article, 'comment_count', self.article.pk, 2)
+        self.buffer.add(Ad, 'view_count', self.ad.pk, 7)
+        
+        self.assertEqual(self.buffer.flush(), 3)
+        self.article.refresh_from_db()
+        self.ad.refresh_from_db()
+        self.assertEqual((self.article.upvote_count, self.article.comment_count), (15, 2))
+        self.assertEqual(self.ad.view_count, 7)
+        self.assertEqual(self.buffer.pending(Article, 'upvote_count', [self.article.pk]), {})
+        self.assertEqual(self.buffer.flush(), 0)
+    
+    def test_counter_is_journaled_again_after_flush(self):
+        self.buffer.add(Ad, 'click_count', self.ad.pk, 1)
+        self.buffer.flush()
+        self.buffer.add(Ad, 'click_count', self.ad.pk, 1)
+        self.buffer.add(Ad, 'click_count', self.ad.pk, 1)
+        self.buffer.flush()
+        
+        self.ad.refresh_from_db()
+        self.assertEqual(self.ad.click_count, 3)
+    
+    def test_reconcile_refuses_while_buffering(self):
+        self.buffer.add(Article, 'upvote_count', self.article.pk, 1)
+        with mock.patch('interactions.management.commands.reconcile_counters.counter_buffer', self.buffer):
+            with self.assertRaises(CommandError):
+                call_command('reconcile_counters')
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.upvote_count, 10)
+    
+    def test_flush_never_goes_negative(self):
+        self.buffer.add(Article, 'comment_count', self.article.pk, -4)
+        self.buffer.flush()
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.comment_count, 0)
+
+
+class CommentTreeTests(TestCase):
+    """Threads page in a constant number of queries, however deep they go"""
+    
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='reader@example.com')
+        self.article = Article.objects.create(
+            title='Threads', source_name='Test', url='https://example.com/threads',
+            published_at=timezone.now(),
+        )
+    
+    def comment(self, parent=None, **kwargs):
+        return Comment.objects.create(
+            user=self.user, article=self.article, parent=parent, content='text', **kwargs
+        )
+    
+    def test_path_and_depth(self):
+        root = self.comment()
+        reply = self.comment(parent=root)
+        self.assertEqual(root.depth, 0)
+        self.assertEqual(reply.depth, 1)
+        self.assertEqual(reply.path, root.path + Comment.path_step(reply.pk))
+    
+    def test_reply_parent_must_be_on_the_same_article(self):
+        other = Article.objects.create(
+            title='Elsewhere', source_name='Test', url='https://example.com/elsewhere',
+            published_at=timezone.now(),
+        )
+        foreign = Comment.objects.create(user=self.user, article=other, content='text')
+        
+        data = {'content': 'reply', 'parent': foreign.pk}
+        serializer = CommentCreateSerializer(data=data, context={'article': self.article})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('parent', serializer.errors)
+        
+        serializer = CommentCreateSerializer(data=data, context={'article': other})
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+    
+    def test_page_is_two_queries_at_any_depth(self):
+        for depth in (3, 8):
+            parent = self.comment()
+            for _ in range(depth):
+                parent = self.comment(parent=parent)
+            
+            with self.assertNumQueries(2):
+                threads, _ = article_comment_page(self.article, replies_per_thread=depth)
+            
+            # Newest thread first; follow its only chain of replies down
+            node, levels = threads[0], 0
+            while node['replies']:
+                node, levels = node['replies'][0], levels + 1
+            self.assertEqual(levels, depth)
+    
+    def test_nesting_hides_deleted_subtrees(self):
+        root = self.comment()
+        first = self.comment(parent=root)
+        self.comment(parent=first)
+        self.comment(parent=root)
+        deleted = self.comment(parent=root, is_active=False)
+        self.comment(parent=deleted)
+        
+        threads, _ = article_comment_page(self.article)
+        self.assertEqual(len(threads), 1)
+        self.assertEqual([len(reply['replies']) for reply in threads[0]['replies']], [1, 0])
+        
+        threads, _ = article_comment_page(self.article, max_depth=1)
+        self.assertEqual([len(reply['replies']) for reply in threads[0]['replies']], [0, 0])
+    
+    def test_thread_cursor(self):
+        roots = [self.comment() for _ in range(3)]
+        
+        threads, cursor = article_comment_page(self.article, page_size=2)
+        self.assertEqual([t['id'] for t in threads], [roots[2].id, roots[1].id])
+        self.assertIsNotNone(cursor)
+        
+        threads, cursor = article_comment_page(self.article, cursor=cursor, page_size=2)
+        self.assertEqual([t['id'] for t in threads], [roots[0].id])
+        self.assertIsNone(cursor)
+    
+    def test_load_more_replies(self):
+        root = self.comment()
+        other = self.comment()
+        replies = [self.comment(parent=root) for _ in range(4)]
+        self.comment(parent=other)
+        
+        threads, _ = article_comment_page(self.article, replies_per_thread=2)
+        thread = next(t for t in threads if t['id'] == root.id)
+        self.assertEqual([r['id'] for r in thread['replies']], [replies[0].id, replies[1].id])
+        self.assertIsNotNone(thread['replies_next_cursor'])
+        self.assertIsNone(next(t for t in threads if t['id'] == other.id)['replies_next_cursor'])
+        
+        more, cursor = comment_replies_page(root, cursor=thread['replies_next_cursor'])
+        self.assertEqual([r['id'] for r in more], [replies[2].id, replies[3].id])
+        self.assertIsNone(cursor)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class AdSelectorTests(TestCase):
+    """Ads are picked by priority weight from the snapshot, without queries"""
+    
+    def setUp(self):
+        self.selector = AdSelector(ttl=60, check_interval=60)
+        self.low = Ad.objects.create(title='Low', link_url='https://example.com/low', priority=0)
+        self.high = Ad.objects.create(title='High', link_url='https://example.com/high', priority=9)
+        Ad.objects.create(title='Off', link_url='https://example.com/off', priority=100, is_active=False)
+    
+    def test_pick_is_weighted_by_priority(self):
+        self.selector.snapshot()
+        with self.assertNumQueries(0):
+            picks = [self.selector.pick()['id'] for _ in range(2000)]
+        
+        self.assertEqual(set(picks), {self.low.id, self.high.id})
+        # Weights 1 and 10
+        self.assertGreater(picks.count(self.high.id), picks.count(self.low.id) * 5)
+    
+    def test_invalidate_reloads(self):
+        self.selector.snapshot()
+        Ad.objects.filter(pk=self.high.pk).update(is_active=False)
+        self.selector.invalidate()
+        
+        self.assertEqual(self.selector.pick()['id'], self.low.id)
+    
+    def test_no_active_ads(self):
+        Ad.objects.update(is_active=False)
+        self.assertIsNone(self.selector.pick())
+    
+    def test_get_only_finds_active_ads(self):
+        self.assertEqual(self.selector.get(self.high.id)['title'], 'High')
+        with self.assertNumQueries(0):
+            self.assertIsNone(self.selector.get(self.high.id + 1))
+
+
+class AdRollupTests(TestCase):
+    """Ad events land in the hourly rollups and come back as CTR series"""
+    
+    def setUp(self):
+        self.ad = Ad.objects.create(title='Rollup', link_url='https://example.com/rollup')
+        self.hour = current_hour()
+    
+    def test_events_fill_current_hour(self):
+        for _ in range(4):
+            record_impression(self.ad.id)
+        record_click(self.ad.id)
+        
+        stat = AdHourlyStat.objects.get(ad=self.ad)
+        self.assertEqual((stat.hour, stat.impressions, stat.clicks), (self.hour, 4, 1))
+        self.ad.refresh_from_db()
+        self.assertEqual((self.ad.view_count, self.ad.click_count), (4, 1))
+    
+    def test_series_by_hour_and_day(self):
+        AdHourlyStat.objects.create(ad=self.ad, hour=self.hour - timedelta(hours=1), impressions=10, clicks=1)
+        AdHourlyStat.objects.create(ad=self.ad, hour=self.hour, impressions=30, clicks=1)
+        start, end = self.hour - timedelta(hours=1), self.hour + timedelta(hours=1)
+        
+        hourly = performance_series(start, end, 'hour')[self.ad.id]
+        self.assertEqual([(b['impressions'], b['clicks'], b['ctr']) for b in hourly], [(10, 1, 10.0), (30, 1, 3.33)])
+        
+        daily = performance_series(start, end, 'day')[self.ad.id]
+        self.assertEqual(sum(b['impressions'] for b in daily), 40)
+        self.assertEqual(performance_series(end, end + timedelta(hours=1)), {})
+    
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_buffered_rollups_flush(self):
+        buffer = CounterBuffer(enabled=True)
+        key = AdHourlyStat.counter_key(self.ad.id, self.hour)
+        buffer.add(AdHourlyStat, 'impressions', key, 5)
+        buffer.add(AdHourlyStat, 'clicks', key, 2)
+        # Deltas for a deleted ad are dropped, not retried forever
+        buffer.add(AdHourlyStat, 'impressions', AdHourlyStat.counter_key(self.ad.id + 1000, self.hour), 1)
+        
+        buffer.flush()
+        stat = AdHourlyStat.objects.get()
+        self.assertEqual((stat.ad_id, stat.impressions, stat.clicks), (self.ad.id, 5, 2))
+    
+    def test_unbuffered_event_is_one_update_per_counter(self):
+        record_impression(self.ad.id)
+        # The hour's row exists now: no Ad lookup, no INSERT
+        with self.assertNumQueries(2):
+            record_impression(self.ad.id)
+        self.assertEqual(AdHourlyStat.objects.get(ad=self.ad).impressions, 2)
+    
+    def test_series_range_is_capped(self):
+        admin = get_user_model().objects.create_user(email='admin@example.com', is_staff=True)
+        self.client.force_login(admin)
+        params = {'from': '2026-01-01', 'to': '2026-06-01'}
+        
+        response = self.client.get('/api/admin/ads/performance/', params)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('90 days', response.json()['from'][0])
+        
+        response = self.client.get('/api/admin/ads/performance/', {**params, 'granularity': 'day'})
+        self.assertEqual(response.status_code, 200)
+    
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_ad_events_buffered_by_themselves(self):
+        buffer = CounterBuffer(ad_events=True)
+        self.assertFalse(buffer.buffers(Article))
+        
+        with mock.patch('interactions.counters.counter_buffer', buffer):
+            with self.captureOnCommitCallbacks(execute=True), self.assertNumQueries(0):
+                record_impression(self.ad.id)
+                record_impression(self.ad.id)
+                record_click(self.ad.id)
+        self.assertFalse(AdHourlyStat.objects.exists())
+        
+        buffer.flush()
+        stat = AdHourlyStat.objects.get(ad=self.ad)
+        self.ad.refresh_from_db()
+        self.assertEqual((stat.impressions, stat.clicks), (2, 1))
+        self.assertEqual((self.ad.view_count, self.ad.click_count), (2, 1))
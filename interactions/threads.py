@@ -0,0 +1,147 @@
+import base64
+from django.conf import settings
+from django.db.models import Q, Window
+from django.db.models.functions import RowNumber, Substr
+from rest_framework.exceptions import NotFound
+
+from news.pagination import decode_cursor, encode_cursor
+from .models import Comment
+from .serializers import CommentSerializer
+
+# Limits for one response
+MAX_THREAD_DEPTH = getattr(settings, 'COMMENT_MAX_THREAD_DEPTH', 10)
+THREADS_PAGE_SIZE = getattr(settings, 'COMMENT_THREADS_PAGE_SIZE', 20)
+REPLIES_PER_THREAD = getattr(settings, 'COMMENT_REPLIES_PER_THREAD', 5)
+REPLIES_PAGE_SIZE = getattr(settings, 'COMMENT_REPLIES_PAGE_SIZE', 20)
+
+
+def encode_path_cursor(path):
+    """Opaque cursor token for a position in a thread"""
+    return base64.urlsafe_b64encode(path.encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_path_cursor(token):
+    """Return the path of a thread cursor token. Raises NotFound if invalid."""
+    try:
+        path = base64.urlsafe_b64decode((token + '=' * (-len(token) % 4)).encode('ascii')).decode('ascii')
+    except (TypeError, ValueError, UnicodeError):
+        raise NotFound('Invalid cursor')
+    if not path or path.strip('0123456789/'):
+        raise NotFound('Invalid cursor')
+    return path
+
+
+def nest_comments(rows, root_depth, keep_orphans=False):
+    """
+    Serialize comments ordered by path and nest replies under their parent
+
+    Comments at root_depth become the returned roots. A reply whose parent
+    is not in rows (deleted, or on an earlier page) is dropped, or kept as a
+    root when keep_orphans is set so the client can attach it by parent id.
+    """
+    nodes = {}
+    roots = []
+    for comment, item in zip(rows, CommentSerializer(rows, many=True).data):
+        item['replies'] = []
+        nodes[comment.id] = item
+        if comment.depth == root_depth:
+            roots.append(item)
+        elif comment.parent_id in nodes:
+            nodes[comment.parent_id]['replies'].append(item)
+        elif keep_orphans:
+            roots.append(item)
+    return roots
+
+
+def path_range(paths):
+    """Bounds of every path starting with one of the given thread roots"""
+    # Everything below "…45/" sorts before "…450" ('/' < '0' in C collation)
+    return min(paths), max(paths)[:-1] + '0'
+
+
+def article_comment_page(article, cursor=None, page_size=THREADS_PAGE_SIZE,
+                         replies_per_thread=REPLIES_PER_THREAD, max_depth=MAX_THREAD_DEPTH):
+    """
+    One page of an article's threads, newest first, each with its first replies
+
+    Threads are keyset-paginated on (created_at, id) over the
+    Comment(article, created_at) index. The first replies of every thread on
+    the page come from a second query, cut per thread with a window
+    function; threads with more carry a replies_next_cursor for
+    /api/comments/{id}/replies/. Two queries however deep the threads go.
+
+    Returns (threads, next_cursor)
+    """
+    roots = Comment.objects.filter(
+        article=article, is_active=True, depth=0
+    ).select_related('user').order_by('-created_at', '-id')
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        roots = roots.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    # One extra row tells us whether there is a next page
+    roots = list(roots[:page_size + 1])
+    next_cursor = None
+    if len(roots) > page_size:
+        roots = roots[:page_size]
+        next_cursor = encode_cursor(roots[-1].created_at, roots[-1].id)
+
+    replies_by_thread = {root.path: [] for root in roots}
+    if roots and replies_per_thread:
+        lower, upper = path_range(list(replies_by_thread))
+        thread = Substr('path', 1, Comment.PATH_STEP_WIDTH + 1)
+        replies = Comment.objects.filter(
+            article=article, is_active=True,
+            depth__gte=1, depth__lte=max_depth,
+            path__gte=lower, path__lt=upper,
+        ).annotate(
+            thread=thread,
+            position=Window(RowNumber(), partition_by=[thread], order_by='path'),
+        ).filter(
+            thread__in=list(replies_by_thread),
+            position__lte=replies_per_thread + 1,
+        ).select_related('user').order_by('path')
+        for reply in replies:
+            replies_by_thread[reply.thread].append(reply)
+
+    threads = []
+    for root in roots:
+        replies = replies_by_thread[root.path]
+        replies_next_cursor = None
+        if len(replies) > replies_per_thread:
+            replies = replies[:replies_per_thread]
+            replies_next_cursor = encode_path_cursor(replies[-1].path if replies else root.path)
+        item = nest_comments([root] + replies, root_depth=0)[0]
+        item['replies_next_cursor'] = replies_next_cursor
+        threads.append(item)
+    return threads, next_cursor
+
+
+def comment_replies_page(parent, cursor=None, page_size=REPLIES_PAGE_SIZE, max_depth=MAX_THREAD_DEPTH):
+    """
+    Replies below a comment in thread order, keyset-paginated on path
+
+    On later pages, replies whose parent came on an earlier page are
+    returned at the top level with their parent id.
+
+    Returns (replies, next_cursor)
+    """
+    comments = Comment.objects.filter(
+        article_id=parent.article_id,
+        path__startswith=parent.path,
+        depth__gt=parent.depth,
+        depth__lte=parent.depth + max_depth,
+        is_active=True,
+    ).select_related('user').order_by('path')
+    if cursor:
+        after = decode_path_cursor(cursor)
+        if not after.startswith(parent.path):
+            raise NotFound('Invalid cursor')
+        comments = comments.filter(path__gt=after)
+
+    rows = list(comments[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_path_cursor(rows[-1].path)
+    return nest_comments(rows, root_depth=parent.depth + 1, keep_orphans=bool(cursor)), next_cursor
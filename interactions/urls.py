@@ -4,6 +4,7 @@ from . import views
 
 urlpatterns = [
     # Upvote URLs
+    path('articles/my-upvotes/', views.my_upvotes, name='my-upvotes'),
     path('articles/<int:article_id>/upvote/', views.toggle_upvote, name='toggle-upvote'),
     path('articles/<int:article_id>/my-upvote/', views.my_upvote_status, name='my-upvote'),
     path('articles/<int:article_id>/upvotes/', views.article_upvote_count, name='upvote-count'),
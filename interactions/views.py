@@ -1,21 +1,35 @@
 # interactions/views.py
 from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 from django.shortcuts import get_object_or_404
-from django.db import IntegrityError
+from django.db import transaction
 from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from datetime import datetime, time, timedelta, timezone as dt_timezone
 
 from news.models import Article
+from users.utils import PremiumService
+from news.caching import bump, invalidate_articles, user_generation
 from .models import Upvote, Comment, Ad
+from .ads import (
+    ad_selector, click_through_rate, performance_series, record_click, record_impression
+)
+from .counters import counter_buffer, increment_counter, toggle_article_upvote
+from .threads import article_comment_page, comment_replies_page
 from .serializers import (
     UpvoteResponseSerializer, ArticleUpvoteStatusSerializer,
-    CommentSerializer, CommentCreateSerializer, CommentUpdateSerializer,
-    AdSerializer
+    CommentSerializer, CommentCreateSerializer, CommentUpdateSerializer
 )
 
 
 # ========== Upvote Views ==========
+MY_UPVOTES_MAX_IDS = 100  # Upper bound on ?ids= per my-upvotes request
+
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def toggle_upvote(request, article_id):
@@ -24,35 +38,17 @@ def toggle_upvote(request, article_id):
     
     POST /api/articles/{id}/upvote/
     """
-    article = get_object_or_404(Article, id=article_id, is_active=True)
-    user = request.user
+    article = get_object_or_404(Article.objects.only('id'), id=article_id, is_active=True)
     
-    try:
-        # Check if upvote exists
-        upvote = Upvote.objects.get(user=user, article=article)
-        # If exists, delete it
-        upvote.delete()
-        upvoted = False
-        message = "Upvote removed"
-    except Upvote.DoesNotExist:
-        # If doesn't exist, create it
-        try:
-            Upvote.objects.create(user=user, article=article)
-            upvoted = True
-            message = "Upvote added"
-        except IntegrityError:
-            return Response(
-                {'error': 'Could not process upvote'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-    
-    # Update article's upvote count
-    article.upvote_count = article.upvotes.count()
-    article.save(update_fields=['upvote_count'])
+    # Delete-or-insert plus an atomic counter update, in one transaction
+    upvoted, upvote_count = toggle_article_upvote(request.user, article)
+    message = "Upvote added" if upvoted else "Upvote removed"
+    invalidate_articles([article.id], listing=False)
+    bump(user_generation(request.user.id, 'upvotes'))
     
     response_data = {
         'upvoted': upvoted,
-        'upvote_count': article.upvote_count,
+        'upvote_count': upvote_count,
         'message': message
     }
     
@@ -74,12 +70,46 @@ def my_upvote_status(request, article_id):
     
     response_data = {
         'has_upvoted': has_upvoted,
-        'upvote_count': article.upvote_count
+        'upvote_count': counter_buffer.current(article, 'upvote_count')
     }
     
     return Response(response_data, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def my_upvotes(request):
+    """
+    Check the current user's upvote status for many articles at once.
+    
+    GET /api/articles/my-upvotes/?ids=1,2,3
+    
+    One indexed query on Upvote(user, article), however many ids.
+    """
+    try:
+        article_ids = list(dict.fromkeys(
+            int(value) for value in request.query_params.get('ids', '').split(',') if value.strip()
+        ))
+    except ValueError:
+        return Response(
+            {'error': 'ids must be a comma-separated list of article ids'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if len(article_ids) > MY_UPVOTES_MAX_IDS:
+        return Response(
+            {'error': f'At most {MY_UPVOTES_MAX_IDS} ids per request'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    upvoted = Upvote.upvoted_article_ids(request.user, article_ids)
+    
+    return Response({
+        'results': {str(article_id): article_id in upvoted for article_id in article_ids},
+        'upvoted_ids': [article_id for article_id in article_ids if article_id in upvoted],
+    }, status=status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def article_upvote_count(request, article_id):
@@ -92,33 +122,41 @@ def article_upvote_count(request, article_id):
     
     return Response({
         'article_id': article.id,
-        'upvote_count': article.upvote_count
+        'upvote_count': counter_buffer.current(article, 'upvote_count')
     }, status=status.HTTP_200_OK)
 
 
 # ========== Comment Views ==========
+def cursor_link(request, cursor):
+    """Absolute URL of the next page for a cursor, or None"""
+    if not cursor:
+        return None
+    return replace_query_param(request.build_absolute_uri(), 'cursor', cursor)
+
+
 @api_view(['GET', 'POST'])
 @permission_classes([permissions.IsAuthenticatedOrReadOnly])
 def article_comments(request, article_id):
     """
     List all comments for an article or create a new comment.
     
-    GET  /api/articles/{id}/comments/ - List comments
+    GET  /api/articles/{id}/comments/ - Newest threads with their first replies
+    GET  /api/articles/{id}/comments/?cursor=<next_cursor> - Next page of threads
     POST /api/articles/{id}/comments/ - Create comment
+    
+    Threads with more replies carry replies_next_cursor for
+    /api/comments/{id}/replies/?cursor=...
     """
     article = get_object_or_404(Article, id=article_id, is_active=True)
     
     if request.method == 'GET':
-        comments = Comment.objects.filter(
-            article=article, 
-            is_active=True,
-            parent__isnull=True  # Only top-level comments
-        ).select_related('user').prefetch_related('replies')
-        
-        serializer = CommentSerializer(comments, many=True)
+        threads, next_cursor = article_comment_page(article, cursor=request.query_params.get('cursor'))
         return Response({
-            'count': comments.count(),
-            'results': serializer.data
+            # Denormalized count (all active comments) - no COUNT query
+            'count': counter_buffer.current(article, 'comment_count'),
+            'next': cursor_link(request, next_cursor),
+            'next_cursor': next_cursor,
+            'results': threads,
         })
     
     elif request.method == 'POST':
@@ -128,20 +166,21 @@ def article_comments(request, article_id):
                 status=status.HTTP_401_UNAUTHORIZED
             )
         
-        serializer = CommentCreateSerializer(data=request.data)
+        serializer = CommentCreateSerializer(data=request.data, context={'article': article})
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        comment = Comment.objects.create(
-            user=request.user,
-            article=article,
-            content=serializer.validated_data['content'],
-            parent=serializer.validated_data.get('parent')
-        )
-        
-        # Update article comment count
-        article.comment_count = article.comments.filter(is_active=True).count()
-        article.save(update_fields=['comment_count'])
+        with transaction.atomic():
+            comment = Comment.objects.create(
+                user=request.user,
+                article=article,
+                content=serializer.validated_data['content'],
+                parent=serializer.validated_data.get('parent')
+            )
+            
+            # Update article comment count
+            increment_counter(Article, 'comment_count', article.id, 1)
+        invalidate_articles([article.id], listing=False)
         
         response_serializer = CommentSerializer(comment)
         return Response(
@@ -185,14 +224,13 @@ def comment_detail(request, comment_id):
         return Response(response_serializer.data)
     
     elif request.method == 'DELETE':
-        # Soft delete
-        comment.is_active = False
-        comment.save()
-        
-        # Update article comment count
-        article = comment.article
-        article.comment_count = article.comments.filter(is_active=True).count()
-        article.save(update_fields=['comment_count'])
+        # Soft delete - only the request that flips is_active moves the count
+        with transaction.atomic():
+            deleted = Comment.objects.filter(pk=comment.pk, is_active=True).update(is_active=False)
+            if deleted:
+                # Update article comment count
+                increment_counter(Article, 'comment_count', comment.article_id, -1)
+        invalidate_articles([comment.article_id], listing=False)
         
         return Response(
             {'message': 'Comment deleted successfully'},
@@ -204,17 +242,19 @@ def comment_detail(request, comment_id):
 @permission_classes([permissions.AllowAny])
 def comment_replies(request, comment_id):
     """
-    Get replies to a comment.
+    Get replies to a comment, with their own replies nested.
     
     GET /api/comments/{id}/replies/
+    GET /api/comments/{id}/replies/?cursor=<next_cursor> - Load more replies
     """
     parent = get_object_or_404(Comment, id=comment_id, is_active=True)
-    replies = Comment.objects.filter(parent=parent, is_active=True).select_related('user')
+    replies, next_cursor = comment_replies_page(parent, cursor=request.query_params.get('cursor'))
     
-    serializer = CommentSerializer(replies, many=True)
     return Response({
-        'count': replies.count(),
-        'results': serializer.data
+        'count': len(replies),
+        'next': cursor_link(request, next_cursor),
+        'next_cursor': next_cursor,
+        'results': replies,
     })
 
 
@@ -223,33 +263,28 @@ def comment_replies(request, comment_id):
 @permission_classes([permissions.AllowAny])
 def random_ad(request):
     """
-    Get a random active ad.
+    Get a random active ad, weighted by priority.
     Returns no ad if user is premium.
     
     GET /api/ads/random/
     """
     user = request.user
     
-    # Check if user is premium
-    if user.is_authenticated and user.is_premium_active:
+    # Check if user is premium (cached entitlement - no user query)
+    if user.is_authenticated and PremiumService.is_premium(user.id):
         return Response({'ad': None, 'show_ad': False})
     
-    # Get random ad
-    ads = Ad.objects.filter(is_active=True)
+    # Weighted by priority from the in-process snapshot - no query
+    ad = ad_selector.pick()
     
-    if not ads.exists():
+    if ad is None:
         return Response({'ad': None, 'show_ad': False})
     
-    # Simple random selection
-    ad = ads.order_by('?').first()
-    
     # Track view
-    ad.view_count += 1
-    ad.save(update_fields=['view_count'])
+    record_impression(ad['id'])
     
-    serializer = AdSerializer(ad)
     return Response({
-        'ad': serializer.data,
+        'ad': ad,
         'show_ad': True
     })
 
@@ -262,10 +297,11 @@ def track_ad_click(request, ad_id):
     
     POST /api/ads/{id}/click/
     """
-    ad = get_object_or_404(Ad, id=ad_id, is_active=True)
+    # Checked against the ad snapshot instead of a SELECT
+    if ad_selector.get(ad_id) is None:
+        raise NotFound('Ad not found')
     
-    ad.click_count += 1
-    ad.save(update_fields=['click_count'])
+    record_click(ad_id)
     
     return Response({'message': 'Click tracked'}, status=status.HTTP_200_OK)
 
@@ -276,19 +312,100 @@ def ad_performance(request):
     """
     Admin view to see ad performance metrics.
     
-    GET /api/admin/ads/performance/
+    GET /api/admin/ads/performance/ - Lifetime totals per ad
+    GET /api/admin/ads/performance/?from=2026-10-01&to=2026-10-08&granularity=hour|day
+        - Impressions, clicks and CTR per bucket from the hourly rollups
+          (default: the last 7 days by hour; at most 90 days by hour or
+          two years by day)
     """
+    if any(param in request.query_params for param in ('from', 'to', 'granularity')):
+        return ad_performance_series(request)
+    
     ads = Ad.objects.all().values(
         'id', 'title', 'view_count', 'click_count', 'priority', 'is_active'
     ).order_by('-view_count')
     
+    # Include clicks and views still in the write-behind buffer
+    ads = list(ads)
+    if counter_buffer.buffers(Ad):
+        ad_ids = [ad['id'] for ad in ads]
+        pending_views = counter_buffer.pending(Ad, 'view_count', ad_ids)
+        pending_clicks = counter_buffer.pending(Ad, 'click_count', ad_ids)
+        for ad in ads:
+            ad['view_count'] += pending_views.get(ad['id'], 0)
+            ad['click_count'] += pending_clicks.get(ad['id'], 0)
+        ads.sort(key=lambda ad: ad['view_count'], reverse=True)
+    
     performance_data = []
     for ad in ads:
-        ctr = (ad['click_count'] / ad['view_count'] * 100) if ad['view_count'] > 0 else 0
         performance_data.append({
             **ad,
-            'ctr': round(ctr, 2),
+            'ctr': click_through_rate(ad['view_count'], ad['click_count']),
             'clicks_per_view': f"{ad['click_count']}/{ad['view_count']}"
         })
     
-    return Response(performance_data)
\ No newline at end of file
+    return Response(performance_data)
+
+
+def parse_report_time(value, name):
+    """Aware datetime from an ISO date or datetime query parameter"""
+    parsed = parse_datetime(value)
+    if parsed is None:
+        date = parse_date(value)
+        if date is None:
+            raise ValidationError({name: 'Use an ISO date or datetime, e.g. 2026-10-01 or 2026-10-01T13:00:00Z'})
+        parsed = datetime.combine(date, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+# Longest ?from= / ?to= range per granularity (bounds the scan and the response)
+SERIES_MAX_RANGE = {
+    'hour': timedelta(days=90),
+    'day': timedelta(days=2 * 365),
+}
+
+
+def ad_performance_series(request):
+    """Time-bucketed ad performance for ad_performance"""
+    granularity = request.query_params.get('granularity', 'hour')
+    if granularity not in ('hour', 'day'):
+        raise ValidationError({'granularity': 'Must be hour or day'})
+    
+    now = timezone.now()
+    end = parse_report_time(request.query_params['to'], 'to') if 'to' in request.query_params else now
+    start = (
+        parse_report_time(request.query_params['from'], 'from')
+        if 'from' in request.query_params else end - timedelta(days=7)
+    )
+    if start >= end:
+        raise ValidationError({'from': 'Must be before to'})
+    if end - start > SERIES_MAX_RANGE[granularity]:
+        raise ValidationError({
+            'from': f"At most {SERIES_MAX_RANGE[granularity].days} days per request with granularity={granularity}"
+        })
+    
+    series = performance_series(start, end, granularity)
+    titles = dict(Ad.objects.filter(id__in=list(series)).values_list('id', 'title'))
+    
+    results = []
+    for ad_id, buckets in series.items():
+        impressions = sum(bucket['impressions'] for bucket in buckets)
+        clicks = sum(bucket['clicks'] for bucket in buckets)
+        results.append({
+            'id': ad_id,
+            'title': titles.get(ad_id),
+            'impressions': impressions,
+            'clicks': clicks,
+            'ctr': click_through_rate(impressions, clicks),
+            'series': buckets,
+        })
+    results.sort(key=lambda ad: ad['impressions'], reverse=True)
+    
+    return Response({
+        'from': start,
+        'to': end,
+        'granularity': granularity,
+        'results': results,
+    })
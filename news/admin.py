@@ -1,10 +1,12 @@
 from django.contrib import admin
 from .models import Article
+from . import stats
+from .caching import invalidate_articles
 
 @admin.register(Article)
 class ArticleAdmin(admin.ModelAdmin):
     list_display = ['title', 'source_name', 'bias_label', 'bias_score', 'published_at','upvote_count',  'comment_count',]
-    list_filter = ['bias_label', 'source_name', 'published_at']
+    list_filter = ['bias_label', 'needs_rescore', 'source_name', 'published_at']
     search_fields = ['title', 'content']
     date_hierarchy = 'published_at'
     readonly_fields = ['fetched_at']
@@ -17,11 +19,50 @@ class ArticleAdmin(admin.ModelAdmin):
             'fields': ('source_name', 'published_at')
         }),
         ('Bias Detection (Future ML)', {
-            'fields': ('bias_label', 'bias_score'),
+            'fields': ('bias_label', 'bias_score', 'needs_rescore'),
             'classes': ('collapse',)
         }),
         ('Metadata', {
             'fields': ('fetched_at', 'is_active'),
             'classes': ('collapse',)
         }),
-    )
\ No newline at end of file
+    )
+    
+    actions = ['activate_articles', 'deactivate_articles']
+    
+    # Keep the /api/articles/stats/ rollups and the API response cache
+    # in step with admin edits
+    def save_model(self, request, obj, form, change):
+        old_rows = stats.snapshot(Article.objects.filter(pk=obj.pk)) if change else []
+        super().save_model(request, obj, form, change)
+        stats.record_changed(old_rows, [obj])
+        invalidate_articles([obj.pk])
+    
+    def delete_model(self, request, obj):
+        old_rows = stats.snapshot(Article.objects.filter(pk=obj.pk))
+        article_id = obj.pk
+        super().delete_model(request, obj)
+        stats.record_removed(old_rows)
+        invalidate_articles([article_id])
+    
+    def delete_queryset(self, request, queryset):
+        old_rows = stats.snapshot(queryset)
+        article_ids = list(queryset.values_list('id', flat=True))
+        super().delete_queryset(request, queryset)
+        stats.record_removed(old_rows)
+        invalidate_articles(article_ids)
+    
+    def _set_active(self, queryset, is_active):
+        old_rows = stats.snapshot(queryset)
+        article_ids = list(queryset.values_list('id', flat=True))
+        queryset.update(is_active=is_active)
+        invalidate_articles(article_ids)
+        stats.record_changed(old_rows, [{**row, 'is_active': is_active} for row in old_rows])
+    
+    @admin.action(description='Activate selected articles')
+    def activate_articles(self, request, queryset):
+        self._set_active(queryset, True)
+    
+    @admin.action(description='Deactivate selected articles')
+    def deactivate_articles(self, request, queryset):
+        self._set_active(queryset, False)
@@ -0,0 +1,196 @@
+import hashlib
+import logging
+import time
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
+from rest_framework.renderers import JSONRenderer
+
+logger = logging.getLogger(__name__)
+
+# Generations - a write bumps the ones it affects, and every cached response
+# built under the old value is never looked up again (it just expires)
+ARTICLES = 'articles'   # list and sources: bumped on insert / bias / active changes
+STATS = 'stats'         # /stats/: bumped whenever the ArticleStat counters move
+
+
+def article_generation(article_id):
+    """Generation of one article's detail response"""
+    return f"article:{article_id}"
+
+
+def user_generation(user_id, name):
+    """Generation of per-user data mixed into a response (e.g. my_upvote)"""
+    return f"user:{user_id}:{name}"
+
+
+def _generation_key(name):
+    return f"api:generation:{name}"
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def get_generations(names):
+    """
+    Return {name: generation} for the given names.
+    Generations are millisecond timestamps of the last write; a missing one
+    (never bumped, or evicted) starts at the current time.
+    """
+    keys = {_generation_key(name): name for name in names}
+    found = cache.get_many(list(keys))
+    missing = [key for key in keys if key not in found]
+    if missing:
+        now = _now_ms()
+        for key in missing:
+            cache.add(key, now, timeout=None)
+        found.update(cache.get_many(missing))
+        for key in missing:
+            found.setdefault(key, now)
+    return {name: found[key] for key, name in keys.items()}
+
+
+def bump(*names):
+    """
+    Move the given generations forward once the current transaction commits,
+    so no reader can cache pre-commit data under the new generation.
+    """
+    def _bump():
+        keys = [_generation_key(name) for name in names]
+        current = cache.get_many(keys)
+        now = _now_ms()
+        cache.set_many({key: max(now, current.get(key, 0) + 1) for key in keys}, timeout=None)
+    
+    if names:
+        transaction.on_commit(_bump)
+
+
+def invalidate_articles(article_ids=(), listing=True):
+    """
+    Invalidate cached article responses after a write
+    
+    article_ids: articles whose detail response changed
+    listing: True when the write can change list / sources responses
+    """
+    names = [article_generation(article_id) for article_id in article_ids]
+    if listing:
+        names.append(ARTICLES)
+    bump(*names)
+
+
+def normalize_query(query_params):
+    """Query string with keys and repeated values sorted"""
+    return '&'.join(
+        f"{key}={value}"
+        for key in sorted(query_params)
+        for value in sorted(query_params.getlist(key))
+    )
+
+
+def _not_modified(request, etag, last_modified):
+    """True if the client's validators still match (If-None-Match wins over If-Modified-Since)"""
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        etags = [tag.removeprefix('W/') for tag in parse_etags(if_none_match)]
+        return '*' in etags or etag in etags
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since'))
+    return if_modified_since is not None and last_modified <= if_modified_since
+
+
+def cache_response(method):
+    """
+    Serve a read-only viewset action from a pre-rendered JSON body, with
+    ETag / Last-Modified validators
+    
+    The view provides get_cache_generations() for the current action and may
+    set cache_periods = {action: seconds} for payloads that depend on the
+    clock: their version rolls over every period. An action whose body goes
+    stale at a time only it knows (e.g. 24h after an article's publication)
+    sets self.cache_window = (start, end) in epoch seconds while building the
+    response; the entry is then served only until end. Only GET/HEAD requests
+    rendered as JSON are cached, and only 200 responses are stored.
+    
+    Without API_CACHE_ENABLED (a shared cache) the action runs as-is, with
+    no cache and no validators: generations bumped by other processes would
+    never be seen, so an ETag built from them could 304 stale data forever.
+    
+    The ETag is a hash of the same data versions that make up the cache key
+    (plus the entry's window), so a matching If-None-Match is answered with
+    304 from the cache entry alone, before the database or any serializer.
+    """
+    @wraps(method)
+    def wrapper(self, request, *args, **kwargs):
+        renderer = getattr(request, 'accepted_renderer', None)
+        if not settings.API_CACHE_ENABLED:
+            return method(self, request, *args, **kwargs)
+        if request.method not in ('GET', 'HEAD') or not isinstance(renderer, JSONRenderer):
+            return method(self, request, *args, **kwargs)
+        
+        # Read generations before the database so a write that lands while
+        # we build the response is stored under the old, already-dead key
+        generations = get_generations(self.get_cache_generations())
+        last_modified = max(generations.values()) // 1000
+        timeout = settings.API_CACHE_TIMEOUT
+        now = time.time()
+        period = getattr(self, 'cache_periods', {}).get(self.action)
+        if period:
+            period_start = int(now) // period * period
+            generations['period'] = period_start
+            last_modified = max(last_modified, period_start)
+            timeout = min(timeout, period)
+        
+        raw_key = '|'.join([
+            self.action,
+            ','.join(f"{name}={value}" for name, value in sorted(generations.items())),
+            ','.join(f"{key}={value}" for key, value in sorted(kwargs.items())),
+            normalize_query(request.query_params),
+            request.accepted_media_type,
+            request.build_absolute_uri('/'),  # pagination links are absolute
+        ])
+        digest = hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
+        key = f"api:{self.basename}:{self.action}:{digest}"
+        
+        # (body, window) - window is the view's cache_window, or None
+        entry = cache.get(key)
+        cache_status = 'HIT'
+        if entry is not None and entry[1] is not None and now >= entry[1][1]:
+            entry = None
+        if entry is None:
+            response = method(self, request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            body = renderer.render(response.data, request.accepted_media_type, self.get_renderer_context())
+            window = getattr(self, 'cache_window', None)
+            if window is not None:
+                timeout = max(min(timeout, int(window[1] - now)), 1)
+            entry = (body, window)
+            cache.set(key, entry, timeout=timeout)
+            cache_status = 'MISS'
+        
+        body, window = entry
+        if window is not None:
+            digest = hashlib.sha256(f"{digest}|{window[0]}".encode('utf-8')).hexdigest()
+            last_modified = max(last_modified, int(window[0]))
+        etag = quote_etag(digest[:32])
+        
+        if _not_modified(request, etag, last_modified):
+            response = HttpResponseNotModified()
+            cache_status = 'REVALIDATED'
+        else:
+            response = HttpResponse(body, content_type=renderer.media_type)
+        
+        if any(name.startswith('user:') for name in generations):
+            patch_vary_headers(response, ['Authorization', 'Cookie'])
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        # Let clients keep the body but always revalidate it
+        response['Cache-Control'] = 'no-cache'
+        response['X-Cache'] = cache_status
+        return response
+    
+    return wrapper
@@ -1,6 +1,7 @@
 import django_filters
-from django.db import models
+from rest_framework import filters
 from .models import Article
+from .search import search_articles, fuzzy_match, parse_similarity
 
 class ArticleFilter(django_filters.FilterSet):
     """
@@ -9,6 +10,8 @@ class ArticleFilter(django_filters.FilterSet):
     - /api/articles/?from_date=2024-01-01
     - /api/articles/?bias=left&source=CNN
     - /api/articles/?search=election
+    - /api/articles/?search=election&highlight=1
+    - /api/articles/?fuzzy_source=foxnews&similarity=0.4
     """
     
     # Date filters
@@ -30,6 +33,20 @@ class ArticleFilter(django_filters.FilterSet):
         help_text="Filter by exact source name (e.g., CNN, Fox News)"
     )
     
+    # Typo-tolerant filters (pg_trgm)
+    fuzzy_source = django_filters.CharFilter(
+        method='filter_fuzzy',
+        help_text="Fuzzy match on source name (e.g., 'foxnews', 'reuter')"
+    )
+    fuzzy_title = django_filters.CharFilter(
+        method='filter_fuzzy',
+        help_text="Fuzzy match on headline"
+    )
+    similarity = django_filters.NumberFilter(
+        method='filter_similarity',
+        help_text="Minimum similarity for fuzzy filters (0.3 to 1, default 0.3)"
+    )
+    
     # Bias filter
     bias = django_filters.ChoiceFilter(
         field_name='bias_label',
@@ -52,7 +69,11 @@ class ArticleFilter(django_filters.FilterSet):
     # Search filter (custom method)
     search = django_filters.CharFilter(
         method='filter_search',
-        help_text="Search in title and content"
+        help_text="Full-text search in title and content (supports \"quotes\", or, -exclude)"
+    )
+    highlight = django_filters.BooleanFilter(
+        method='filter_highlight',
+        help_text="With search: add a highlighted content snippet (search_headline)"
     )
     
     class Meta:
@@ -60,8 +81,39 @@ class ArticleFilter(django_filters.FilterSet):
         fields = ['source_name', 'bias_label', 'is_active']
     
     def filter_search(self, queryset, name, value):
-        """Search in title and content"""
-        return queryset.filter(
-            models.Q(title__icontains=value) | 
-            models.Q(content__icontains=value)
-        )
\ No newline at end of file
+        """Ranked full-text search in title and content"""
+        highlight = str(self.data.get('highlight', '')).lower() in ('1', 'true', 'yes')
+        return search_articles(queryset, value, highlight=highlight)
+    
+    def filter_highlight(self, queryset, name, value):
+        """Handled by filter_search"""
+        return queryset
+    
+    def filter_fuzzy(self, queryset, name, value):
+        """Trigram match on source_name or title"""
+        field = 'source_name' if name == 'fuzzy_source' else 'title'
+        threshold = parse_similarity(self.data.get('similarity'))
+        return fuzzy_match(queryset, field, value, threshold=threshold)
+    
+    def filter_similarity(self, queryset, name, value):
+        """Handled by filter_fuzzy"""
+        return queryset
+
+
+class ArticleOrderingFilter(filters.OrderingFilter):
+    """Order search and fuzzy results by relevance unless ?ordering= is given"""
+    
+    # Relevance annotations added by ArticleFilter, in order of precedence
+    relevance_annotations = ['search_rank', 'title_similarity', 'source_name_similarity']
+    
+    def get_ordering(self, request, queryset, view):
+        # Decide from what the filters actually annotated: blank or
+        # whitespace-only ?search= / ?fuzzy_*= values are skipped by them
+        self.annotations = queryset.query.annotations
+        return super().get_ordering(request, queryset, view)
+    
+    def get_default_ordering(self, view):
+        for name in self.relevance_annotations:
+            if name in self.annotations:
+                return [f'-{name}', '-published_at']
+        return super().get_default_ordering(view)
\ No newline at end of file
@@ -0,0 +1,102 @@
+import threading
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Defaults for every pool; override per pool name with settings.HTTP_POOLS
+DEFAULT_POOL_SETTINGS = {
+    'pool_connections': 4,    # Hosts kept in the pool manager
+    'pool_maxsize': 10,       # Keep-alive connections per host
+    'connect_timeout': 3.05,  # Seconds to open TCP + TLS
+    'read_timeout': 30,       # Seconds to wait for a response
+}
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+def get_pool_settings(name):
+    """Return pool settings for a named pool, merged over the defaults"""
+    pools = getattr(settings, 'HTTP_POOLS', {})
+    return {
+        **DEFAULT_POOL_SETTINGS,
+        **pools.get('default', {}),
+        **pools.get(name, {}),
+    }
+
+
+def get_session(name):
+    """
+    Return the shared requests.Session for a named pool.
+    Every client using the same name shares keep-alive connections.
+    """
+    session = _sessions.get(name)
+    if session is None:
+        with _lock:
+            session = _sessions.get(name)
+            if session is None:
+                config = get_pool_settings(name)
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=config['pool_connections'],
+                    pool_maxsize=config['pool_maxsize'],
+                )
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _sessions[name] = session
+                logger.info(f"HTTP pool '{name}' created ({config['pool_maxsize']} connections per host)")
+    return session
+
+
+def get_timeout(name, read_timeout=None):
+    """Return a (connect, read) timeout tuple for a named pool"""
+    config = get_pool_settings(name)
+    return (config['connect_timeout'], read_timeout or config['read_timeout'])
+
+
+def close_sessions():
+    """Close every shared session (used on shutdown)"""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def pool_stats(session):
+    """
+    Connection reuse statistics for a session.
+    
+    Returns:
+        dict with per-host request/connection counts, the reuse ratio
+        (share of requests served on an existing connection) and the
+        number of idle keep-alive connections.
+    """
+    hosts = {}
+    adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+    for adapter in adapters.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            idle = sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0
+            hosts[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                'requests': pool.num_requests,
+                'connections_opened': pool.num_connections,
+                'idle_connections': idle,
+            }
+    
+    total_requests = sum(h['requests'] for h in hosts.values())
+    total_connections = sum(h['connections_opened'] for h in hosts.values())
+    reuse_ratio = (total_requests - total_connections) / total_requests if total_requests else 0.0
+    
+    return {
+        'requests': total_requests,
+        'connections_opened': total_connections,
+        'open_connections': sum(h['idle_connections'] for h in hosts.values()),
+        'reuse_ratio': round(reuse_ratio, 3),
+        'hosts': hosts,
+    }
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+from urllib.parse import urlparse
+from django.conf import settings
+from .ml_client import ml_client
+
+logger = logging.getLogger(__name__)
+
+
+def score_and_save(service, articles, batch_size=None):
+    """
+    Predict bias for a NewsAPI payload and bulk save it
+    
+    Returns the bulk_save_articles() result plus:
+    - rescore: articles saved without a prediction (ML unavailable)
+    - predictions: list of (title, prediction or None) for reporting
+    """
+    # Articles without title are skipped by the save step
+    to_predict = []
+    for index, article_data in enumerate(articles):
+        if not article_data.get('title') or article_data['title'] == '[Removed]':
+            continue
+        source = (article_data.get('source') or {}).get('name') or 'Unknown'
+        to_predict.append((index, article_data['title'], source))
+    
+    results = ml_client.predict_many(
+        [(title, source) for _, title, source in to_predict],
+        batch_size=batch_size
+    )
+    
+    predictions = [None] * len(articles)
+    for (index, _, _), prediction in zip(to_predict, results):
+        predictions[index] = prediction
+    
+    result = service.bulk_save_articles(articles, predictions=predictions)
+    result['rescore'] = sum(1 for prediction in results if prediction is None)
+    result['predictions'] = [(title, prediction) for (_, title, _), prediction in zip(to_predict, results)]
+    return result
+
+
+class HostRateLimiter:
+    """Spaces out requests to one host to at most `rate` per second"""
+    
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def wait(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class ConcurrentNewsFetcher:
+    """
+    Fetch many (country, page) targets from NewsAPI concurrently
+    
+    Requests run on the service's pooled session in worker threads, bounded
+    by `concurrency` and a per-host rate limit. Pages are yielded as soon as
+    they arrive so they can be saved while the rest are still in flight.
+    """
+    
+    def __init__(self, service, concurrency=4, rate_per_host=None):
+        self.service = service
+        self.concurrency = max(1, concurrency)
+        self.rate_per_host = rate_per_host or getattr(settings, 'NEWS_API_RATE_LIMIT', 5)
+        self._limiters = {}
+    
+    def _limiter_for(self, url):
+        host = urlparse(url).netloc
+        if host not in self._limiters:
+            self._limiters[host] = HostRateLimiter(self.rate_per_host)
+        return self._limiters[host]
+    
+    async def fetch(self, targets, page_size=10):
+        """
+        Async generator of (country, page, articles) in completion order
+        
+        targets: iterable of (country, page) tuples
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limiter = self._limiter_for(self.service.base_url)
+        
+        async def fetch_one(country, page):
+            async with semaphore:
+                await limiter.wait()
+                articles = await asyncio.to_thread(
+                    self.service.fetch_political_news,
+                    country=country, page_size=page_size, page=page
+                )
+                return country, page, articles
+        
+        tasks = [asyncio.create_task(fetch_one(country, page)) for country, page in targets]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def build_targets(countries, pages):
+    """All (country, page) pairs for the given countries and page count"""
+    return [(country, page) for country in countries for page in range(1, pages + 1)]
@@ -0,0 +1,97 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from news.models import Article
+from news.serializers import (
+    ArticleListSerializer, ARTICLE_LIST_COLUMNS, serialize_article_rows,
+)
+from datetime import timedelta
+import time
+
+
+class Command(BaseCommand):
+    help = 'Benchmark ArticleListSerializer against the fast list path per page'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=str,
+            default='20,100',
+            help='Comma-separated page sizes (default: 20,100)'
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=200,
+            help='Pages rendered per measurement (default: 200)'
+        )
+        parser.add_argument(
+            '--db',
+            action='store_true',
+            help='Use real articles and include the query in the timing'
+        )
+    
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        iterations = max(1, options['iterations'])
+        renderer = JSONRenderer()
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"⏱️ Rendering list pages x {iterations} ({'database' if options['db'] else 'in-memory rows'})"
+        ))
+        
+        for size in sizes:
+            if options['db']:
+                queryset = Article.objects.filter(is_active=True).order_by('-published_at')
+                if queryset.count() < size:
+                    raise CommandError(f"Need at least {size} active articles for --db")
+                
+                def serializer_page():
+                    page = list(queryset.defer('search_vector')[:size])
+                    return renderer.render(ArticleListSerializer(page, many=True).data)
+                
+                def fast_page():
+                    page = list(queryset.values(*ARTICLE_LIST_COLUMNS)[:size])
+                    return renderer.render(serialize_article_rows(page))
+            else:
+                instances = self.make_articles(size)
+                rows = [{column: getattr(a, column) for column in ARTICLE_LIST_COLUMNS} for a in instances]
+                
+                def serializer_page():
+                    return renderer.render(ArticleListSerializer(instances, many=True).data)
+                
+                def fast_page():
+                    return renderer.render(serialize_article_rows(rows))
+            
+            if serializer_page() != fast_page():
+                raise CommandError(f"Fast path output differs from ArticleListSerializer (page size {size})")
+            
+            slow = self.time_per_page(serializer_page, iterations)
+            fast = self.time_per_page(fast_page, iterations)
+            self.stdout.write(
+                f" Page size {size}: serializer {slow * 1000:.3f} ms, "
+                f"fast path {fast * 1000:.3f} ms ({slow / fast:.1f}x), output identical"
+            )
+    
+    def time_per_page(self, render_page, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            render_page()
+        return (time.perf_counter() - start) / iterations
+    
+    def make_articles(self, count):
+        """Unsaved articles shaped like NewsAPI data"""
+        now = timezone.now()
+        labels = ['left', 'center', 'right', 'unclassified']
+        return [
+            Article(
+                id=index + 1,
+                title=f"Senate debates budget bill, part {index} — “quoted” ünïcode",
+                source_name=['Reuters', 'Fox News', 'CNN', 'Associated Press'][index % 4],
+                published_at=now - timedelta(minutes=17 * index, microseconds=index),
+                image_url=f"https://example.com/images/{index}.jpg",
+                bias_label=labels[index % 4],
+                bias_score=round((index % 21 - 10) / 10, 2),
+            )
+            for index in range(count)
+        ]
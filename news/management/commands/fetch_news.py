@@ -1,10 +1,11 @@
 from django.core.management.base import BaseCommand
 from news.service import PoliticalNewsService
 from news.models import Article
-from news.ml_client import ml_client 
+from news.ml_client import ml_client
+from news.ingest import ConcurrentNewsFetcher, build_targets, score_and_save
+from asgiref.sync import sync_to_async
+import asyncio
 import logging
-from datetime import datetime
-from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +17,7 @@ class Command(BaseCommand):
             '--count',
             type=int,
             default=10,
-            help='Number of articles to fetch (default: 10)'
+            help='Number of articles to fetch per page (default: 10)'
         )
         parser.add_argument(
             '--country',
@@ -24,85 +25,72 @@ class Command(BaseCommand):
             default='us',
             help='Country code (default: us)'
         )
+        parser.add_argument(
+            '--countries',
+            type=str,
+            default=None,
+            help='Comma-separated country codes fetched concurrently (e.g. us,gb,ca)'
+        )
+        parser.add_argument(
+            '--pages',
+            type=int,
+            default=1,
+            help='Pages to fetch per country (default: 1)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Maximum NewsAPI requests in flight (default: 4)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Articles per ML batch request (default: ML_BATCH_SIZE setting)'
+        )
     
     def handle(self, *args, **options):
         count = options['count']
-        country = options['country']
+        countries = [c.strip().lower() for c in (options['countries'] or options['country']).split(',') if c.strip()]
+        pages = max(1, options['pages'])
+        self.batch_size = options['batch_size'] or ml_client.batch_size
         
-        self.stdout.write(self.style.SUCCESS(f'📰 Fetching {count} articles from {country.upper()}...'))
+        self.stdout.write(self.style.SUCCESS(
+            f'📰 Fetching {count} articles x {pages} page(s) from {", ".join(c.upper() for c in countries)}...'
+        ))
         
         # Check if ML service is healthy
         self.stdout.write("🔍 Checking ML service...")
         if ml_client.health_check():
             self.stdout.write(self.style.SUCCESS("   ✅ ML Service is healthy"))
         else:
-            self.stdout.write(self.style.WARNING("   ⚠️ ML Service unreachable - using default bias"))
+            self.stdout.write(self.style.WARNING("   ⚠️ ML Service unreachable - articles will be queued for re-scoring"))
         
         self.stdout.write("")
         logger.info("="*50)
-        logger.info(f"FETCH_NEWS STARTED - {count} articles")
+        logger.info(f"FETCH_NEWS STARTED - {count} articles x {pages} pages, countries: {countries}")
         
-        service = PoliticalNewsService()
+        self.service = PoliticalNewsService()
+        self.totals = {'saved': 0, 'skipped': 0, 'errors': 0, 'rescore': 0, 'pages': 0}
         
         try:
-            # Fetch articles from NewsAPI
-            articles = service.fetch_political_news(country=country, page_size=count)
+            targets = build_targets(countries, pages)
+            if len(targets) == 1:
+                # Fetch articles from NewsAPI
+                articles = self.service.fetch_political_news(country=countries[0], page_size=count)
+                self.process_page(countries[0], 1, articles)
+            else:
+                asyncio.run(self.fetch_concurrently(targets, count, options['concurrency']))
             
-            if not articles:
+            if not self.totals['pages']:
                 self.stdout.write(self.style.WARNING("No articles fetched"))
                 return
             
-            saved_count = 0
-            skipped_count = 0
-            error_count = 0
-            
-            for article_data in articles:
-                try:
-                    # Skip articles without title
-                    if not article_data.get('title') or article_data['title'] == '[Removed]':
-                        skipped_count += 1
-                        continue
-                    
-                    title = article_data['title']
-                    source = article_data.get('source', {}).get('name', 'Unknown')
-                    
-                    self.stdout.write(f"Predicting: {title[:50]}...")
-                    bias_score, bias_category = ml_client.predict(title, source)
-                    
-                    published_at = article_data.get('publishedAt')
-                    if published_at:
-                        published_at = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-                    else:
-                        published_at = timezone.now()
-                    
-                    article_defaults = {
-                        'content': article_data.get('description', '')[:10000] if article_data.get('description') else '',
-                        'image_url': article_data.get('urlToImage', '')[:500] if article_data.get('urlToImage') else '',
-                        'published_at': published_at,
-                        'url': article_data.get('url', '')[:500],
-                        'bias_label': bias_category,
-                        'bias_score': bias_score,
-                    }
-                    
-                    article, created = Article.objects.get_or_create(
-                        title=title[:500],
-                        source_name=source[:200],
-                        defaults=article_defaults
-                    )
-                    
-                    if created:
-                        saved_count += 1
-                        self.stdout.write(self.style.SUCCESS(f"Saved: {bias_category} ({bias_score:+.2f})"))
-                    else:
-                        skipped_count += 1
-                        self.stdout.write(f"    ⏭️ Skipped (duplicate)")
-                        
-                except Exception as e:
-                    error_count += 1
-                    logger.error(f"Error saving article: {e}")
-                    self.stdout.write(self.style.ERROR(f"    ❌ Error: {e}"))
+            saved_count = self.totals['saved']
+            skipped_count = self.totals['skipped']
+            error_count = self.totals['errors']
             
-
             self.stdout.write("")
             self.stdout.write(self.style.SUCCESS("=" * 50))
             self.stdout.write(self.style.SUCCESS("SUMMARY"))
@@ -110,11 +98,43 @@ class Command(BaseCommand):
             self.stdout.write(f" Saved: {saved_count}")
             self.stdout.write(f" Skipped: {skipped_count}")
             self.stdout.write(f" Errors: {error_count}")
+            if self.totals['rescore']:
+                self.stdout.write(self.style.WARNING(f" Queued for re-scoring: {self.totals['rescore']}"))
             self.stdout.write(f" Total in DB: {Article.objects.count()}")
+            ml_pool = ml_client.pool_stats()
+            self.stdout.write(f" ML connection reuse: {ml_pool['reuse_ratio']:.0%} ({ml_pool['connections_opened']} opened)")
+            breaker = ml_client.breaker_stats()
+            self.stdout.write(f" ML circuit: {breaker['state']} ({breaker['failures']} failures)")
             self.stdout.write(self.style.SUCCESS("=" * 50))
             
             logger.info(f"FETCH_NEWS COMPLETED - Saved: {saved_count}, Skipped: {skipped_count}, Errors: {error_count}")
-            
+        
         except Exception as e:
             logger.error(f"Command failed: {str(e)}")
-            self.stdout.write(self.style.ERROR(f'Error: {str(e)}'))
\ No newline at end of file
+            self.stdout.write(self.style.ERROR(f'Error: {str(e)}'))
+    
+    async def fetch_concurrently(self, targets, count, concurrency):
+        """Fetch all targets concurrently and save each page as it arrives"""
+        fetcher = ConcurrentNewsFetcher(self.service, concurrency=concurrency)
+        async for country, page, articles in fetcher.fetch(targets, page_size=count):
+            await sync_to_async(self.process_page)(country, page, articles)
+    
+    def process_page(self, country, page, articles):
+        """Predict bias for one page of articles and save it"""
+        if not articles:
+            self.stdout.write(self.style.WARNING(f"{country.upper()} page {page}: no articles"))
+            return
+        
+        self.stdout.write(f"{country.upper()} page {page}: predicting {len(articles)} articles in batches of {self.batch_size}...")
+        result = score_and_save(self.service, articles, batch_size=self.batch_size)
+        
+        for title, prediction in result['predictions']:
+            if prediction is None:
+                self.stdout.write(f"    {title[:50]}... queued for re-scoring")
+            else:
+                bias_score, bias_category = prediction
+                self.stdout.write(f"    {title[:50]}... {bias_category} ({bias_score:+.2f})")
+        
+        self.totals['pages'] += 1
+        for key in ('saved', 'skipped', 'errors', 'rescore'):
+            self.totals[key] += result[key]
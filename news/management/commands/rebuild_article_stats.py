@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from news import stats
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Rebuild the /api/articles/stats/ counters from the articles table'
+    
+    def handle(self, *args, **options):
+        before = stats.get_stats()
+        count = stats.rebuild()
+        after = stats.get_stats()
+        
+        logger.info(f"ARTICLE STATS REBUILT - {count} counters")
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} counters"))
+        for key in ('total_articles', 'active_articles', 'last_7_days_added', 'average_bias_score'):
+            if before[key] != after[key]:
+                self.stdout.write(self.style.WARNING(f" Corrected {key}: {before[key]} -> {after[key]}"))
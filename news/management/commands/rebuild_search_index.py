@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from news.models import Article
+from news.search import SEARCH_DOCUMENT
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Backfill the full-text search vector for existing articles'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Rows updated per statement (default: 2000)'
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Rebuild every row, not only rows without a vector'
+        )
+    
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Article.objects.all()
+        if not options['all']:
+            queryset = queryset.filter(search_vector__isnull=True)
+        
+        ids = list(queryset.order_by('id').values_list('id', flat=True))
+        self.stdout.write(f"🔎 Indexing {len(ids)} articles...")
+        
+        updated = 0
+        for start in range(0, len(ids), batch_size):
+            chunk = ids[start:start + batch_size]
+            updated += Article.objects.filter(id__in=chunk).update(search_vector=SEARCH_DOCUMENT)
+            self.stdout.write(f"    {updated}/{len(ids)}")
+        
+        logger.info(f"SEARCH INDEX REBUILT - {updated} articles")
+        self.stdout.write(self.style.SUCCESS(f"Indexed {updated} articles"))
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from news.models import Article
+from news import stats
+from news.caching import invalidate_articles
+from news.ml_client import ml_client
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Re-score articles saved while the ML service was unavailable'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=500,
+            help='Maximum number of articles to re-score (default: 500)'
+        )
+    
+    def handle(self, *args, **options):
+        limit = options['limit']
+        
+        articles = list(
+            Article.objects.filter(needs_rescore=True)
+            .only('id', 'title', *stats.STAT_FIELDS)
+            .order_by('-published_at')[:limit]
+        )
+        
+        if not articles:
+            self.stdout.write(self.style.SUCCESS("No articles waiting for re-scoring"))
+            return
+        
+        self.stdout.write(f"🔁 Re-scoring {len(articles)} articles...")
+        results = ml_client.predict_many([(a.title, a.source_name) for a in articles])
+        
+        scored = []
+        old_rows = []
+        for article, prediction in zip(articles, results):
+            if prediction is None:
+                continue
+            old_rows.append({field: getattr(article, field) for field in stats.STAT_FIELDS})
+            article.bias_score, article.bias_label = prediction
+            article.needs_rescore = False
+            scored.append(article)
+        
+        with transaction.atomic():
+            Article.objects.bulk_update(scored, ['bias_score', 'bias_label', 'needs_rescore'])
+            stats.record_changed(old_rows, scored)
+            invalidate_articles([article.id for article in scored])
+        
+        remaining = len(articles) - len(scored)
+        logger.info(f"RESCORE COMPLETED - Scored: {len(scored)}, Still pending: {remaining}")
+        self.stdout.write(self.style.SUCCESS(f" Scored: {len(scored)}"))
+        if remaining:
+            self.stdout.write(self.style.WARNING(f" Still pending: {remaining} (ML circuit: {ml_client.breaker.state})"))
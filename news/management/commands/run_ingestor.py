@@ -0,0 +1,152 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from news.http import close_sessions
+import logging
+import random
+import signal
+import threading
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# Key for pg_try_advisory_lock, shared by every replica
+INGESTOR_LOCK_KEY = zlib.crc32(b'newsdebate.run_ingestor')
+
+class Command(BaseCommand):
+    help = 'Run news ingestion as a long-lived process (replaces fetch_news_hourly.sh)'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=3600,
+            help='Seconds between fetch cycles (default: 3600)'
+        )
+        parser.add_argument(
+            '--jitter',
+            type=int,
+            default=120,
+            help='Random +/- seconds added to each interval (default: 120)'
+        )
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=50,
+            help='Articles per page (default: 50)'
+        )
+        parser.add_argument(
+            '--countries',
+            type=str,
+            default='us',
+            help='Comma-separated country codes (default: us)'
+        )
+        parser.add_argument(
+            '--pages',
+            type=int,
+            default=1,
+            help='Pages to fetch per country (default: 1)'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run a single cycle and exit'
+        )
+    
+    def handle(self, *args, **options):
+        self.stop_event = threading.Event()
+        signal.signal(signal.SIGTERM, self.request_stop)
+        signal.signal(signal.SIGINT, self.request_stop)
+        
+        self.lock_connection = None
+        
+        self.stdout.write(self.style.SUCCESS("=" * 50))
+        self.stdout.write(self.style.SUCCESS("   NewsDebate Ingestor"))
+        self.stdout.write(self.style.SUCCESS(f"   Every {options['interval']}s (±{options['jitter']}s)"))
+        self.stdout.write(self.style.SUCCESS("=" * 50))
+        logger.info("RUN_INGESTOR STARTED")
+        
+        try:
+            while not self.stop_event.is_set():
+                if self.acquire_lock():
+                    self.run_cycle(options)
+                else:
+                    self.stdout.write("⏸️ Another replica holds the ingestion lock - standing by")
+                
+                if options['once']:
+                    break
+                
+                delay = max(0, options['interval'] + random.uniform(-options['jitter'], options['jitter']))
+                logger.info(f"Next cycle in {delay:.0f}s")
+                self.stop_event.wait(delay)
+        finally:
+            self.release_lock()
+            close_sessions()
+            logger.info("RUN_INGESTOR STOPPED")
+            self.stdout.write(self.style.SUCCESS("Ingestor stopped"))
+    
+    def request_stop(self, signum, frame):
+        """Signal handler - finish the current cycle, then exit"""
+        logger.info(f"Received signal {signum}, shutting down after current cycle")
+        self.stop_event.set()
+    
+    def run_cycle(self, options):
+        """One fetch + re-score + counter reconcile + premium expiry pass on the warm process"""
+        # Drop the connection only if it broke while we were sleeping
+        if connection.connection is not None and not connection.is_usable():
+            connection.close()
+        
+        try:
+            call_command(
+                'fetch_news',
+                count=options['count'],
+                countries=options['countries'],
+                pages=options['pages'],
+                stdout=self.stdout,
+            )
+            call_command('rescore_articles', stdout=self.stdout)
+            call_command('reconcile_counters', stdout=self.stdout)
+            call_command('expire_premium', stdout=self.stdout)
+        except Exception as e:
+            logger.error(f"Ingestion cycle failed: {e}")
+            self.stdout.write(self.style.ERROR(f"Cycle failed: {e}"))
+    
+    def acquire_lock(self):
+        """
+        Hold a session-level Postgres advisory lock so only one replica ingests.
+        The lock lives on a dedicated connection that stays open between cycles.
+        """
+        if connection.vendor != 'postgresql':
+            return True
+        
+        if self.lock_connection is not None:
+            if self.lock_connection.is_usable():
+                return True
+            # Connection dropped - the lock went with it
+            logger.warning("Ingestion lock connection lost, re-acquiring")
+            self.lock_connection.close()
+            self.lock_connection = None
+        
+        lock_connection = connections.create_connection('default')
+        with lock_connection.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", [INGESTOR_LOCK_KEY])
+            acquired = cursor.fetchone()[0]
+        
+        if acquired:
+            self.lock_connection = lock_connection
+            logger.info("Ingestion lock acquired")
+        else:
+            lock_connection.close()
+        return acquired
+    
+    def release_lock(self):
+        if self.lock_connection is None:
+            return
+        try:
+            with self.lock_connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", [INGESTOR_LOCK_KEY])
+        except Exception as e:
+            logger.warning(f"Could not release ingestion lock: {e}")
+        finally:
+            self.lock_connection.close()
+            self.lock_connection = None
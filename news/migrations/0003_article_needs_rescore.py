@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0002_article_comment_count_article_upvote_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='needs_rescore',
+            field=models.BooleanField(db_index=True, default=False, help_text='ML service was unavailable at ingestion; re-score with rescore_articles.'),
+        ),
+    ]
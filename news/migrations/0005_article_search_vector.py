@@ -0,0 +1,48 @@
+# Generated by Django 6.0.2 on 2026-10-17 10:41
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Keeps search_vector in sync on every insert (including bulk_create) and
+# on updates that touch title or content.
+CREATE_TRIGGER = """
+CREATE OR REPLACE FUNCTION news_article_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.content, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER news_article_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, content ON news_article
+    FOR EACH ROW EXECUTE FUNCTION news_article_search_vector_update();
+"""
+
+DROP_TRIGGER = """
+DROP TRIGGER IF EXISTS news_article_search_vector_trigger ON news_article;
+DROP FUNCTION IF EXISTS news_article_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_article_published_at_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='news_article_search_gin'),
+        ),
+        migrations.RunSQL(CREATE_TRIGGER, reverse_sql=DROP_TRIGGER),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 6.0.2 on 2026-10-17 12:02
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+
+
+def seed_article_stats(apps, schema_editor):
+    """Fill the counters from existing articles (same as rebuild_article_stats)"""
+    Article = apps.get_model('news', 'Article')
+    ArticleStat = apps.get_model('news', 'ArticleStat')
+    aggregates = {
+        'article_count': Count('id'),
+        'active_count': Count('id', filter=Q(is_active=True)),
+        'bias_score_sum': Sum('bias_score'),
+    }
+    
+    counters = []
+    total = Article.objects.aggregate(**aggregates)
+    if total['article_count']:
+        counters.append(ArticleStat(dimension='total', key='', **{**total, 'bias_score_sum': total['bias_score_sum'] or 0.0}))
+    
+    groupings = [
+        ('source', 'source_name', Article.objects.values('source_name')),
+        ('bias', 'bias_label', Article.objects.values('bias_label')),
+        ('day', 'day', Article.objects.annotate(day=TruncDate('published_at')).values('day')),
+    ]
+    for dimension, field, queryset in groupings:
+        for row in queryset.annotate(**aggregates).order_by():
+            key = row.pop(field)
+            counters.append(ArticleStat(
+                dimension=dimension,
+                key=key.isoformat() if dimension == 'day' else key,
+                article_count=row['article_count'],
+                active_count=row['active_count'],
+                bias_score_sum=row['bias_score_sum'] or 0.0,
+            ))
+    ArticleStat.objects.bulk_create(counters, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0006_article_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('total', 'Total'), ('source', 'Source'), ('bias', 'Bias'), ('day', 'Day')], max_length=10)),
+                ('key', models.CharField(blank=True, help_text='Source name, bias label or YYYY-MM-DD', max_length=200)),
+                ('article_count', models.BigIntegerField(default=0)),
+                ('active_count', models.BigIntegerField(default=0)),
+                ('bias_score_sum', models.FloatField(default=0.0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['dimension', '-article_count'], name='news_articl_dimensi_8ef461_idx')],
+                'unique_together': {('dimension', 'key')},
+            },
+        ),
+        migrations.RunPython(seed_article_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.0.2 on 2026-10-17 16:40
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_articlestat'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('source_name'), name='gin_trgm_ops'), name='news_article_source_upper_trgm'),
+        ),
+    ]
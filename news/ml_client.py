@@ -1,20 +1,229 @@
 import requests
 import logging
+import time
+import hashlib
+import threading
+from collections import OrderedDict
 from django.conf import settings
+from django.core.cache import cache
+from .http import get_session, get_timeout, pool_stats
 
 logger = logging.getLogger(__name__)
 
+
+class PredictionCache:
+    """
+    Two-tier cache for bias predictions
+    
+    - In-process LRU (bounded, no network)
+    - Django cache (shared between processes, with TTL)
+    
+    Keys are a hash of the normalized (title, source) plus the model version,
+    so a new model never serves predictions made by an old one.
+    """
+    
+    def __init__(self, model_version='v1', max_size=2048, ttl=60 * 60 * 24 * 7):
+        self.model_version = model_version
+        self.max_size = max_size
+        self.ttl = ttl
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+    
+    def make_key(self, title, source):
+        """Content-addressed key for a (title, source) pair"""
+        normalized = '\x1f'.join([
+            ' '.join((title or '').split()).casefold(),
+            ' '.join((source or 'unknown').split()).casefold(),
+        ])
+        digest = hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+        return f"ml:prediction:{self.model_version}:{digest}"
+    
+    def get_many(self, keys):
+        """
+        Return {key: prediction} for every key found in either tier.
+        A failing shared cache counts as a miss, never as an error.
+        """
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._local:
+                    self._local.move_to_end(key)
+                    found[key] = self._local[key]
+            self.local_hits += len(found)
+        
+        remaining = [key for key in keys if key not in found]
+        if remaining:
+            try:
+                shared = cache.get_many(remaining)
+            except Exception as e:
+                logger.warning(f"Prediction cache read failed: {e}")
+                shared = {}
+            with self._lock:
+                self.shared_hits += len(shared)
+                self.misses += len(remaining) - len(shared)
+                for key, prediction in shared.items():
+                    self._remember(key, tuple(prediction))
+            found.update((key, tuple(prediction)) for key, prediction in shared.items())
+        return found
+    
+    def set_many(self, predictions):
+        """Store {key: prediction} in both tiers"""
+        if not predictions:
+            return
+        with self._lock:
+            for key, prediction in predictions.items():
+                self._remember(key, prediction)
+        try:
+            cache.set_many(predictions, timeout=self.ttl)
+        except Exception as e:
+            logger.warning(f"Prediction cache write failed: {e}")
+    
+    def _remember(self, key, prediction):
+        """Add to the local LRU. Caller holds the lock."""
+        self._local[key] = prediction
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+    
+    def clear_local(self):
+        """Drop the in-process tier"""
+        with self._lock:
+            self._local.clear()
+    
+    def stats(self):
+        """Hit/miss counters"""
+        with self._lock:
+            lookups = self.local_hits + self.shared_hits + self.misses
+            return {
+                'model_version': self.model_version,
+                'local_size': len(self._local),
+                'local_hits': self.local_hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'hit_ratio': round((lookups - self.misses) / lookups, 3) if lookups else 0.0,
+            }
+
+
+class MLServiceUnavailable(Exception):
+    """Raised when the circuit breaker refuses a call to the ML service"""
+
+
+def is_service_failure(error):
+    """
+    True for errors that mean the ML service is down or overloaded:
+    connection errors, timeouts and 5xx responses. A 4xx or a malformed
+    response means the service answered, so it must not trip the breaker.
+    """
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    response = getattr(error, 'response', None)
+    return isinstance(error, requests.exceptions.HTTPError) and response is not None and response.status_code >= 500
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for the ML service
+    
+    - closed: calls go through; consecutive failures are counted
+    - open: calls fail immediately until the reset timeout passes
+    - half_open: a single probe call is let through; success closes the
+      breaker, failure re-opens it with a doubled reset timeout
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold=5, reset_timeout=30, max_reset_timeout=900):
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+    
+    def allow_request(self):
+        """Return True if a call may be made now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Let exactly one probe through
+                self.state = self.HALF_OPEN
+                logger.info("ML circuit half-open, probing service")
+                return True
+            return False
+    
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("ML circuit closed, service recovered")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.reset_timeout = self.base_reset_timeout
+    
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN:
+                # Probe failed - back off exponentially
+                self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+                self._open()
+            elif self.state == self.CLOSED and self.failures >= self.failure_threshold:
+                self._open()
+    
+    def _open(self):
+        """Open the breaker. Caller holds the lock."""
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        logger.error(f"ML circuit open after {self.failures} failures, retry in {self.reset_timeout}s")
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'reset_timeout': self.reset_timeout,
+            }
+
+
 class BiasPredictionClient:
     """Client for the deployed ML bias prediction service"""
     
     def __init__(self, base_url=None):
         self.base_url = base_url or "https://bias-prediction-api.onrender.com"
-        self.timeout = 30
+        self.session = get_session('ml')
+        self.connect_timeout, self.timeout = get_timeout('ml')
+        self.batch_size = getattr(settings, 'ML_BATCH_SIZE', 16)
+        self.max_batch_timeout = getattr(settings, 'ML_MAX_BATCH_TIMEOUT', 60)
+        self.breaker = CircuitBreaker(**getattr(settings, 'ML_CIRCUIT_BREAKER', {}))
+        
+        cache_settings = getattr(settings, 'ML_PREDICTION_CACHE', {})
+        self.cache = PredictionCache(
+            model_version=getattr(settings, 'ML_MODEL_VERSION', 'v1'),
+            **cache_settings
+        )
+    
+    def pool_stats(self):
+        """Connection pool statistics for the ML service session"""
+        return pool_stats(self.session)
+    
+    def cache_stats(self):
+        """Prediction cache hit/miss counters"""
+        return self.cache.stats()
+    
+    def breaker_stats(self):
+        """Circuit breaker state"""
+        return self.breaker.stats()
     
     def health_check(self):
         """Check if ML service is healthy"""
         try:
-            response = requests.get(f"{self.base_url}/health", timeout=5)
+            response = self.session.get(f"{self.base_url}/health", timeout=(self.connect_timeout, 5))
             return response.status_code == 200
         except:
             return False
@@ -26,60 +235,178 @@ class BiasPredictionClient:
         Returns:
             tuple: (bias_score, bias_category)
         """
+        prediction = self._predict_one(title, source)
+        if prediction is None:
+            return 0.0, 'unclassified'
+        return prediction
+    
+    def predict_batch(self, articles):
+        """
+        Predict bias for multiple articles
+        
+        articles: list of (title, source) tuples
+        """
+        results, misses = self._lookup(articles)
+        if not misses:
+            return results
+        
+        try:
+            predictions = self._request_batch([articles[i] for i in misses])
+        except Exception as e:
+            logger.error(f"Batch prediction error: {e}")
+            predictions = [(0.0, 'unclassified') for _ in misses]
+        
+        for index, prediction in zip(misses, predictions):
+            results[index] = prediction
+        return results
+    
+    def predict_many(self, articles, batch_size=None):
+        """
+        Predict bias for any number of articles using bounded batches
+        
+        Cached predictions are served locally; only misses are sent.
+        A failed batch is split in half and retried; halves that still fail
+        fall back to per-article calls.
+        
+        articles: list of (title, source) tuples
+        
+        Returns:
+            list: (bias_score, bias_category) per article, or None where the
+            service could not score it (caller should re-score later)
+        """
+        batch_size = batch_size or self.batch_size
+        results, misses = self._lookup(articles)
+        
+        for start in range(0, len(misses), batch_size):
+            chunk = misses[start:start + batch_size]
+            predictions = self._predict_chunk([articles[i] for i in chunk])
+            for index, prediction in zip(chunk, predictions):
+                results[index] = prediction
+        return results
+    
+    def _predict_one(self, title, source):
+        """Predict one article. Returns None if the service could not score it."""
+        key = self.cache.make_key(title, source)
+        cached = self.cache.get_many([key])
+        if key in cached:
+            return cached[key]
+        
+        if not self.breaker.allow_request():
+            return None
+        
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/predict",
                 json={
                     "title": title,
                     "source": source if source else "unknown"
                 },
-                timeout=self.timeout
+                timeout=(self.connect_timeout, self.timeout)
             )
             
             if response.status_code == 200:
                 data = response.json()
-                return data.get('bias_score', 0.0), data.get('bias_category', 'unclassified')
+                prediction = (data.get('bias_score', 0.0), data.get('bias_category', 'unclassified'))
+                self.breaker.record_success()
+                self.cache.set_many({key: prediction})
+                return prediction
             else:
                 logger.error(f"ML API error: {response.status_code}")
-                return 0.0, 'unclassified'
-                
+                failed = response.status_code >= 500
+        
         except requests.exceptions.Timeout:
             logger.error("ML service timeout")
-            return 0.0, 'unclassified'
+            failed = True
         except requests.exceptions.ConnectionError:
             logger.error("Cannot connect to ML service")
-            return 0.0, 'unclassified'
+            failed = True
         except Exception as e:
             logger.error(f"Prediction error: {e}")
-            return 0.0, 'unclassified'
+            failed = False
+        
+        # Only an unreachable or failing service counts against the breaker
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return None
     
-    def predict_batch(self, articles):
+    def _lookup(self, articles):
         """
-        Predict bias for multiple articles
+        Resolve articles from the prediction cache.
+        Returns (results, misses): results has None at every miss index.
+        """
+        keys = [self.cache.make_key(title, source) for title, source in articles]
+        found = self.cache.get_many(list(set(keys)))
+        results = [found.get(key) for key in keys]
+        misses = [index for index, result in enumerate(results) if result is None]
+        return results, misses
+    
+    def _predict_chunk(self, articles, split=True):
+        """
+        Send one chunk through the batch endpoint.
+        On failure the chunk is split in half once, then each half that
+        fails again is predicted article by article. Returns None for
+        articles that could not be scored.
+        """
+        if len(articles) <= 1:
+            return [self._predict_one(title, source) for title, source in articles]
         
-        articles: list of (title, source) tuples
+        try:
+            return self._request_batch(articles)
+        except MLServiceUnavailable:
+            return [None for _ in articles]
+        except Exception as e:
+            if not split:
+                logger.warning(f"Batch of {len(articles)} failed again ({e}), predicting one by one")
+                return [self._predict_one(title, source) for title, source in articles]
+            logger.warning(f"Batch of {len(articles)} failed ({e}), splitting")
+            middle = len(articles) // 2
+            return (self._predict_chunk(articles[:middle], split=False) +
+                    self._predict_chunk(articles[middle:], split=False))
+    
+    def _request_batch(self, articles):
         """
+        POST to the batch endpoint and cache the results.
+        Raises MLServiceUnavailable while the circuit is open, and the
+        underlying error on any other failure.
+        """
+        payload = {
+            "articles": [
+                {"title": title, "source": source if source else "unknown"}
+                for title, source in articles
+            ]
+        }
+        if not self.breaker.allow_request():
+            raise MLServiceUnavailable("ML circuit open")
+        
         try:
-            payload = {
-                "articles": [
-                    {"title": title, "source": source}
-                    for title, source in articles
-                ]
-            }
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/predict/batch",
                 json=payload,
-                timeout=self.timeout * len(articles)
+                timeout=(self.connect_timeout, min(self.timeout * len(articles), self.max_batch_timeout))
             )
+            response.raise_for_status()
             
-            if response.status_code == 200:
-                data = response.json()
-                return [(p['bias_score'], p['bias_category']) for p in data['predictions']]
-            else:
-                return [(0.0, 'unclassified') for _ in articles]
+            predictions = response.json()['predictions']
+            if len(predictions) != len(articles):
+                raise ValueError(f"Expected {len(articles)} predictions, got {len(predictions)}")
+            predictions = [(p['bias_score'], p['bias_category']) for p in predictions]
         except Exception as e:
-            logger.error(f"Batch prediction error: {e}")
-            return [(0.0, 'unclassified') for _ in articles]
+            # A 4xx or a malformed response still proves the service is up
+            if is_service_failure(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            raise
+        
+        self.breaker.record_success()
+        
+        self.cache.set_many({
+            self.cache.make_key(title, source): prediction
+            for (title, source), prediction in zip(articles, predictions)
+        })
+        return predictions
 
 # Create a global instance
-ml_client = BiasPredictionClient()
\ No newline at end of file
+ml_client = BiasPredictionClient()
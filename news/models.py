@@ -1,4 +1,7 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models.functions import Upper
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 class Article(models.Model):    
@@ -31,10 +34,19 @@ class Article(models.Model):
         validators=[MinValueValidator(-1.0), MaxValueValidator(1.0)],
         help_text="Bias score from -1 (left) to +1 (right). Default 0 = neutral."
     )
+    needs_rescore = models.BooleanField(
+        default=False,
+        db_index=True,
+        help_text="ML service was unavailable at ingestion; re-score with rescore_articles."
+    )
 
     upvote_count = models.PositiveIntegerField(default=0)
     comment_count = models.PositiveIntegerField(default=0)
     
+    # Full-text search document: title (weight A) + content (weight B).
+    # Maintained by a database trigger; see migration 0005.
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     # Metadata
     fetched_at = models.DateTimeField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
@@ -44,6 +56,14 @@ class Article(models.Model):
         indexes = [
             models.Index(fields=['bias_label', '-published_at']),
             models.Index(fields=['source_name', '-published_at']),
+            # Keyset pagination walks (published_at, id) newest first
+            models.Index(fields=['-published_at', '-id']),
+            GinIndex(fields=['search_vector'], name='news_article_search_gin'),
+            # Fuzzy / substring matching (pg_trgm)
+            GinIndex(fields=['source_name'], name='news_article_source_trgm', opclasses=['gin_trgm_ops']),
+            GinIndex(fields=['title'], name='news_article_title_trgm', opclasses=['gin_trgm_ops']),
+            # source_name__icontains compiles to UPPER(source_name::text) LIKE UPPER(...)
+            GinIndex(OpClass(Upper('source_name'), name='gin_trgm_ops'), name='news_article_source_upper_trgm'),
         ]
         # Prevent duplicate articles by title + source
         unique_together = ['title', 'source_name']
@@ -71,4 +91,35 @@ class Article(models.Model):
     def update_comment_count(self):
         """Update comment count"""
         self.comment_count = self.comments.filter(is_active=True).count()
-        self.save(update_fields=['comment_count'])
\ No newline at end of file
+        self.save(update_fields=['comment_count'])
+
+
+class ArticleStat(models.Model):
+    """
+    Incrementally maintained counters behind /api/articles/stats/
+    
+    One row per (dimension, key): the grand total, each source, each bias
+    label and each publication day. Updated by ingestion and admin edits
+    (see news/stats.py); rebuild with `manage.py rebuild_article_stats`.
+    """
+    DIMENSION_CHOICES = [
+        ('total', 'Total'),
+        ('source', 'Source'),
+        ('bias', 'Bias'),
+        ('day', 'Day'),
+    ]
+    
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES)
+    key = models.CharField(max_length=200, blank=True, help_text="Source name, bias label or YYYY-MM-DD")
+    article_count = models.BigIntegerField(default=0)
+    active_count = models.BigIntegerField(default=0)
+    bias_score_sum = models.FloatField(default=0.0)
+    
+    class Meta:
+        unique_together = ['dimension', 'key']
+        indexes = [
+            models.Index(fields=['dimension', '-article_count']),
+        ]
+    
+    def __str__(self):
+        return f"{self.dimension}:{self.key} = {self.article_count}"
@@ -0,0 +1,104 @@
+import base64
+from datetime import datetime
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def encode_cursor(*values):
+    """Opaque cursor token for a keyset position"""
+    raw = '|'.join(v.isoformat() if isinstance(v, datetime) else str(v) for v in values)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Return (timestamp, id) from a cursor token. Raises NotFound if invalid."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        timestamp, pk = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8').split('|')
+        return datetime.fromisoformat(timestamp), int(pk)
+    except (TypeError, ValueError, UnicodeError):
+        raise NotFound('Invalid cursor')
+
+
+def row_value(row, field):
+    """Read a field from a model instance or a .values() dict"""
+    return row[field] if isinstance(row, dict) else getattr(row, field)
+
+
+class ArticlePagination(PageNumberPagination):
+    """
+    Page-number pagination with an opt-in keyset (cursor) mode
+    
+    - /api/articles/?page=3 - page numbers (COUNT + OFFSET)
+    - /api/articles/?paginate=cursor - first page, keyset mode
+    - /api/articles/?paginate=cursor&cursor=<token> - next page
+    - &include_count=1 - also return the total count
+    
+    Keyset mode walks (published_at, id) newest first, so every page costs
+    the same index range scan as page 1. It is only used for the default
+    ordering; any other ?ordering= falls back to page numbers.
+    """
+    mode_query_param = 'paginate'
+    cursor_query_param = 'cursor'
+    include_count_query_param = 'include_count'
+    keyset_ordering = ('-published_at', '-id')
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.use_cursor(queryset, request)
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+        
+        self.request = request
+        page_size = self.get_page_size(request)
+        
+        token = request.query_params.get(self.cursor_query_param)
+        keyset = queryset.order_by(*self.keyset_ordering)
+        if token:
+            published_at, pk = decode_cursor(token)
+            keyset = keyset.filter(
+                Q(published_at__lt=published_at) |
+                Q(published_at=published_at, id__lt=pk)
+            )
+        
+        # One extra row tells us whether there is a next page
+        rows = list(keyset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_cursor = None
+        if self.has_next:
+            last = rows[-1]
+            self.next_cursor = encode_cursor(row_value(last, 'published_at'), row_value(last, 'id'))
+        
+        include_count = request.query_params.get(self.include_count_query_param, '').lower() in ('1', 'true', 'yes')
+        self.count = queryset.count() if include_count else None
+        return rows
+    
+    def use_cursor(self, queryset, request):
+        """Keyset mode only applies to the default newest-first ordering"""
+        if request.query_params.get(self.mode_query_param) != 'cursor':
+            return False
+        return tuple(queryset.query.order_by) in ((), ('-published_at',), self.keyset_ordering)
+    
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+    
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        
+        response = {}
+        if self.count is not None:
+            response['count'] = self.count
+        response['next'] = self.get_next_link()
+        response['next_cursor'] = self.next_cursor
+        response['results'] = data
+        return Response(response)
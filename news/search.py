@@ -0,0 +1,83 @@
+from django.contrib.postgres.search import (
+    SearchHeadline, SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+)
+from django.db.models import F, Max, Q
+
+SEARCH_CONFIG = 'english'
+
+# pg_trgm's default similarity threshold. The % operator (the only form the
+# GIN trigram index can serve) uses it, so lower thresholds are not allowed.
+MIN_SIMILARITY = 0.3
+
+# Must match the trigger in migration 0005
+SEARCH_DOCUMENT = (
+    SearchVector('title', weight='A', config=SEARCH_CONFIG) +
+    SearchVector('content', weight='B', config=SEARCH_CONFIG)
+)
+
+
+def search_articles(queryset, text, highlight=False):
+    """
+    Full-text search over the GIN-indexed search_vector
+    
+    Annotates search_rank (ts_rank) and, when highlight is set,
+    search_headline (a snippet of content with <mark> around matches).
+    """
+    query = SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+    queryset = queryset.filter(search_vector=query).annotate(
+        search_rank=SearchRank(F('search_vector'), query)
+    )
+    if highlight:
+        queryset = queryset.annotate(
+            search_headline=SearchHeadline(
+                'content', query,
+                config=SEARCH_CONFIG,
+                start_sel='<mark>',
+                stop_sel='</mark>',
+                max_words=35,
+                min_words=15,
+            )
+        )
+    return queryset
+
+
+def parse_similarity(value):
+    """Clamp a ?similarity= value to [MIN_SIMILARITY, 1]"""
+    try:
+        threshold = float(value)
+    except (TypeError, ValueError):
+        return MIN_SIMILARITY
+    return min(max(threshold, MIN_SIMILARITY), 1.0)
+
+
+def fuzzy_match(queryset, field, text, threshold=MIN_SIMILARITY):
+    """
+    Typo-tolerant trigram match on a column with a gin_trgm_ops index
+    
+    Annotates <field>_similarity (0..1). The % operator narrows rows via the
+    index; a threshold above the default is applied on top of it.
+    """
+    annotation = f'{field}_similarity'
+    queryset = queryset.filter(**{f'{field}__trigram_similar': text}).annotate(
+        **{annotation: TrigramSimilarity(field, text)}
+    )
+    if threshold > MIN_SIMILARITY:
+        queryset = queryset.filter(**{f'{annotation}__gte': threshold})
+    return queryset
+
+
+def source_suggestions(queryset, text, limit=10):
+    """
+    Autocomplete source names: substring or fuzzy matches, best first
+    icontains is served by the trigram index on UPPER(source_name),
+    trigram_similar by the one on source_name.
+    """
+    return list(
+        queryset.filter(
+            Q(source_name__icontains=text) | Q(source_name__trigram_similar=text)
+        )
+        .values('source_name')
+        .annotate(similarity=Max(TrigramSimilarity('source_name', text)))
+        .order_by('-similarity', 'source_name')
+        .values_list('source_name', flat=True)[:limit]
+    )
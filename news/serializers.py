@@ -1,8 +1,55 @@
 # news/serializers.py
+from operator import itemgetter
 from rest_framework import serializers
 from .models import Article
 
-class ArticleSerializer(serializers.ModelSerializer):
+
+class SearchResultMixin:
+    """Add search_rank / search_headline when the row came from a search"""
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        rank = getattr(instance, 'search_rank', None)
+        if rank is not None:
+            data['search_rank'] = round(rank, 4)
+        headline = getattr(instance, 'search_headline', None)
+        if headline is not None:
+            data['search_headline'] = headline
+        return data
+
+
+class SparseFieldsMixin:
+    """
+    Accept fields=[...] to serialize only those fields
+    (see ArticleViewSet.get_sparse_fields for ?fields= / ?exclude=)
+    """
+    
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+# Model columns read by computed fields, for deferred loading
+COMPUTED_FIELD_COLUMNS = {
+    'summary': ['content'],
+    'bias_display': ['bias_label'],
+    'days_since_published': ['published_at'],
+}
+
+
+def article_columns(fields):
+    """Model columns needed to serialize the given fields"""
+    columns = ['id']
+    for name in fields:
+        for column in COMPUTED_FIELD_COLUMNS.get(name, [name]):
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+
+class ArticleSerializer(SparseFieldsMixin, SearchResultMixin, serializers.ModelSerializer):
     """
     Full article serializer - converts Article model to JSON
     Includes all fields plus computed properties
@@ -44,7 +91,7 @@ class ArticleSerializer(serializers.ModelSerializer):
             return obj.content[:150] + '...' if len(obj.content) > 150 else obj.content
         return "No content available"
 
-class ArticleListSerializer(serializers.ModelSerializer):
+class ArticleListSerializer(SparseFieldsMixin, SearchResultMixin, serializers.ModelSerializer):
     """
     Lightweight serializer for list views (faster responses)
     Used when showing multiple articles
@@ -62,4 +109,61 @@ class ArticleListSerializer(serializers.ModelSerializer):
             'bias_label',
             'bias_display',
             'bias_score',
-        ]
\ No newline at end of file
+        ]
+
+# ========== Fast list path ==========
+# ArticleListSerializer output built straight from .values() rows, without the
+# per-field serializer machinery. Keep in sync with ArticleListSerializer and
+# SearchResultMixin; benchmark_article_list checks the output is identical.
+
+ARTICLE_LIST_COLUMNS = article_columns(ArticleListSerializer.Meta.fields)
+SEARCH_RESULT_COLUMNS = ['search_rank', 'search_headline']
+
+# get_bias_label_display() as a lookup table
+BIAS_DISPLAY = {value: str(label) for value, label in Article._meta.get_field('bias_label').choices}
+
+
+def article_list_columns(queryset, fields=None):
+    """
+    Columns to select for serialize_article_rows(), including search annotations.
+    id and published_at are always selected: keyset pagination reads them.
+    """
+    columns = list(ARTICLE_LIST_COLUMNS) if fields is None else article_columns(fields)
+    if 'published_at' not in columns:
+        columns.append('published_at')
+    annotations = queryset.query.annotations
+    return columns + [column for column in SEARCH_RESULT_COLUMNS if column in annotations]
+
+
+def serialize_article_rows(rows, fields=None):
+    """
+    Same data as ArticleListSerializer(many=True, fields=fields),
+    from .values() dicts
+    """
+    datetime_to_representation = serializers.DateTimeField().to_representation
+    builders = {
+        'id': itemgetter('id'),
+        'title': itemgetter('title'),
+        'source_name': itemgetter('source_name'),
+        'published_at': lambda row: datetime_to_representation(row['published_at']),
+        'image_url': itemgetter('image_url'),
+        'bias_label': itemgetter('bias_label'),
+        'bias_display': lambda row: BIAS_DISPLAY.get(row['bias_label'], row['bias_label']),
+        'bias_score': itemgetter('bias_score'),
+    }
+    selected = [
+        (name, builders[name]) for name in ArticleListSerializer.Meta.fields
+        if fields is None or name in fields
+    ]
+    
+    data = []
+    for row in rows:
+        item = {name: build(row) for name, build in selected}
+        rank = row.get('search_rank')
+        if rank is not None:
+            item['search_rank'] = round(rank, 4)
+        headline = row.get('search_headline')
+        if headline is not None:
+            item['search_headline'] = headline
+        data.append(item)
+    return data
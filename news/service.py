@@ -4,7 +4,10 @@ from datetime import datetime
 from django.conf import settings
 from django.utils import timezone
 from .models import Article
-from django.db import IntegrityError, DataError
+from . import stats
+from .caching import invalidate_articles
+from .http import get_session, get_timeout, pool_stats
+from django.db import IntegrityError, DataError, connection, transaction
 
 logger = logging.getLogger(__name__)
 
@@ -16,10 +19,16 @@ class PoliticalNewsService:
         if not self.api_key:
             logger.error("NEWS_API_KEY not found in settings")
             raise ValueError("NEWS_API_KEY not found in settings")
-        self.base_url = "https://newsapi.org/v2"
+        self.base_url = getattr(settings, 'NEWS_API_BASE_URL', "https://newsapi.org/v2")
+        self.session = get_session('newsapi')
+        self.timeout = get_timeout('newsapi')
         logger.info("PoliticalNewsService initialized")
     
-    def fetch_political_news(self, country='us', page_size=10):
+    def pool_stats(self):
+        """Connection pool statistics for the NewsAPI session"""
+        return pool_stats(self.session)
+    
+    def fetch_political_news(self, country='us', page_size=10, page=1):
         """
         Fetch political news from NewsAPI
         """
@@ -28,13 +37,14 @@ class PoliticalNewsService:
             'country': country,
             'category': 'politics',
             'apiKey': self.api_key,
-            'pageSize': page_size
+            'pageSize': page_size,
+            'page': page
         }
         
-        logger.info(f"📡 Fetching {page_size} articles from {country.upper()}...")
+        logger.info(f"📡 Fetching {page_size} articles from {country.upper()} (page {page})...")
         
         try:
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=self.timeout)
             data = response.json()
             
             if data.get('status') == 'ok':
@@ -58,10 +68,43 @@ class PoliticalNewsService:
             logger.error(f"Error: {str(e)}")
             return []
     
-    def save_articles(self, articles_data):
+    def normalize_article(self, article_data):
+        """
+        Convert one NewsAPI article dict into Article field values.
+        Returns None for articles that should be skipped.
+        """
+        # Skip articles without title
+        if not article_data.get('title') or article_data['title'] == '[Removed]':
+            return None
+        
+        # Parse date
+        published_at = article_data.get('publishedAt')
+        if published_at:
+            published_at = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
+        else:
+            published_at = timezone.now()
+        
+        # Get source name
+        source_name = (article_data.get('source') or {}).get('name') or 'Unknown'
+        
+        return {
+            'title': article_data['title'][:500],
+            'source_name': source_name[:200],
+            'content': article_data.get('description', '')[:10000] if article_data.get('description') else '',
+            'image_url': article_data.get('urlToImage', '')[:500] if article_data.get('urlToImage') else '',
+            'published_at': published_at,
+            'url': (article_data.get('url') or '')[:500],
+        }
+    
+    def save_articles(self, articles_data, bulk=False):
         """
         Save fetched articles to database
+        
+        bulk=True writes the whole payload with bulk_save_articles()
         """
+        if bulk:
+            return self.bulk_save_articles(articles_data)
+        
         saved_count = 0
         skipped_count = 0
         error_count = 0
@@ -70,38 +113,25 @@ class PoliticalNewsService:
         
         for article_data in articles_data:
             try:
-                # Skip articles without title
-                if not article_data.get('title') or article_data['title'] == '[Removed]':
+                fields = self.normalize_article(article_data)
+                if fields is None:
                     skipped_count += 1
                     continue
                 
-                # Parse date
-                published_at = article_data.get('publishedAt')
-                if published_at:
-                    published_at = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-                else:
-                    published_at = timezone.now()
-                
-                # Get source name
-                source_name = article_data.get('source', {}).get('name', 'Unknown')
-                
-                # Prepare data
-                article_defaults = {
-                    'content': article_data.get('description', '')[:10000] if article_data.get('description') else '',
-                    'image_url': article_data.get('urlToImage', '')[:500] if article_data.get('urlToImage') else '',
-                    'published_at': published_at,
-                    'url': article_data.get('url', '')[:500],
-                }
+                title = fields.pop('title')
+                source_name = fields.pop('source_name')
                 
                 # Save to database
                 article, created = Article.objects.get_or_create(
-                    title=article_data['title'][:500],
-                    source_name=source_name[:200],
-                    defaults=article_defaults
+                    title=title,
+                    source_name=source_name,
+                    defaults=fields
                 )
                 
                 if created:
                     saved_count += 1
+                    stats.record_added([article])
+                    invalidate_articles()
                     logger.info(f"Saved: {article.title[:50]}...")
                 else:
                     skipped_count += 1
@@ -124,6 +154,189 @@ class PoliticalNewsService:
             'total': len(articles_data)
         }
     
+    def bulk_save_articles(self, articles_data, predictions=None, update_conflicts=False, batch_size=1000):
+        """
+        Save a whole NewsAPI payload with a single bulk_create per transaction
+        
+        articles_data: list of NewsAPI article dicts
+        predictions: optional list of (bias_score, bias_category) aligned with articles_data;
+                     None entries are saved with needs_rescore=True
+        update_conflicts: refresh content/bias of rows that already exist (matched on url)
+        
+        Duplicates inside the batch (same title + source, or same url) and rows
+        already in the database are counted as skipped, so the counts stay exact.
+        """
+        skipped_count = 0
+        error_count = 0
+        
+        logger.info(f"Bulk saving {len(articles_data)} articles...")
+        
+        # Normalize and dedupe in memory
+        rows = []
+        seen_keys = set()
+        seen_urls = set()
+        for index, article_data in enumerate(articles_data):
+            try:
+                fields = self.normalize_article(article_data)
+            except Exception as e:
+                logger.error(f"Error normalizing article: {str(e)}")
+                error_count += 1
+                continue
+            
+            if fields is None:
+                skipped_count += 1
+                continue
+            
+            key = (fields['title'], fields['source_name'])
+            # Articles without a url are not duplicates of each other
+            if key in seen_keys or (fields['url'] and fields['url'] in seen_urls):
+                skipped_count += 1
+                continue
+            seen_keys.add(key)
+            if fields['url']:
+                seen_urls.add(fields['url'])
+            
+            if predictions is not None:
+                if predictions[index] is None:
+                    # ML service could not score it - keep for re-scoring
+                    fields['needs_rescore'] = True
+                else:
+                    fields['bias_score'], fields['bias_label'] = predictions[index]
+                    fields['needs_rescore'] = False
+            rows.append(fields)
+        
+        saved_count = 0
+        updated_count = 0
+        
+        for start in range(0, len(rows), batch_size):
+            chunk = rows[start:start + batch_size]
+            try:
+                with transaction.atomic():
+                    created, updated, skipped = self._bulk_write(chunk, update_conflicts)
+                saved_count += created
+                updated_count += updated
+                skipped_count += skipped
+            except (IntegrityError, DataError) as e:
+                logger.error(f"Error bulk saving articles: {str(e)}")
+                error_count += len(chunk)
+        
+        # Summary
+        logger.info(
+            f"Summary - Saved: {saved_count}, Updated: {updated_count}, "
+            f"Skipped: {skipped_count}, Errors: {error_count}"
+        )
+        
+        if saved_count > 0:
+            logging.getLogger('news.success').info(f"Successfully saved {saved_count} articles")
+        
+        return {
+            'saved': saved_count,
+            'updated': updated_count,
+            'skipped': skipped_count,
+            'errors': error_count,
+            'total': len(articles_data)
+        }
+    
+    def _bulk_write(self, rows, update_conflicts):
+        """
+        Write one chunk of normalized rows. Returns (created, updated, skipped).
+        Must run inside a transaction.
+        """
+        # An empty url never identifies a stored article (it could overwrite another one)
+        urls = [row['url'] for row in rows if row['url']]
+        titles = [row['title'] for row in rows]
+        
+        # One round trip each to find rows that already exist
+        existing_by_url = {
+            row['url']: row
+            for row in Article.objects.filter(url__in=urls).values('id', 'url', *stats.STAT_FIELDS)
+        }
+        existing_urls = set(existing_by_url)
+        existing_keys = {
+            (title, source_name): url
+            for title, source_name, url in Article.objects.filter(title__in=titles)
+                .values_list('title', 'source_name', 'url')
+        }
+        
+        new_rows = []
+        update_rows = []
+        skipped = 0
+        for row in rows:
+            key_url = existing_keys.get((row['title'], row['source_name']))
+            if row['url'] in existing_urls:
+                # Same url, and title/source is either free or already on this row
+                if update_conflicts and key_url in (None, row['url']):
+                    update_rows.append(row)
+                else:
+                    skipped += 1
+            elif key_url is not None:
+                # Same title + source already stored under another url
+                skipped += 1
+            else:
+                new_rows.append(row)
+        
+        inserted_rows = []
+        if new_rows:
+            # ON CONFLICT DO NOTHING guards against a concurrent writer between
+            # the lookup above and the insert; RETURNING tells us which rows
+            # were really ours (bulk_create(ignore_conflicts=True) can't)
+            inserted_keys = self._insert_ignoring_conflicts([Article(**row) for row in new_rows])
+            inserted_rows = [row for row in new_rows if (row['title'], row['source_name']) in inserted_keys]
+            skipped += len(new_rows) - len(inserted_rows)
+        if inserted_rows:
+            stats.record_added(inserted_rows)
+            invalidate_articles()
+        
+        # Rows without a prediction must not overwrite the stored bias
+        for with_bias in (True, False):
+            group = [row for row in update_rows if ('bias_label' in row) == with_bias]
+            if not group:
+                continue
+            update_fields = ['content', 'image_url', 'published_at']
+            if with_bias:
+                update_fields += ['bias_label', 'bias_score', 'needs_rescore']
+            Article.objects.bulk_create(
+                [Article(**row) for row in group],
+                update_conflicts=True,
+                unique_fields=['url'],
+                update_fields=update_fields,
+            )
+            
+            old_rows = [existing_by_url[row['url']] for row in group]
+            stats.record_changed(old_rows, [
+                {**old, **{field: row[field] for field in update_fields if field in stats.STAT_FIELDS}}
+                for old, row in zip(old_rows, group)
+            ])
+            invalidate_articles([old['id'] for old in old_rows])
+        
+        return len(inserted_rows), len(update_rows), skipped
+    
+    def _insert_ignoring_conflicts(self, articles):
+        """
+        INSERT ... ON CONFLICT DO NOTHING in one statement. Returns the
+        (title, source_name) keys of the rows actually inserted - unlike the
+        url, that key is never blank.
+        """
+        meta = Article._meta
+        fields = [f for f in meta.concrete_fields if not f.primary_key and not f.generated]
+        params = [
+            field.get_db_prep_save(field.pre_save(article, True), connection)
+            for article in articles
+            for field in fields
+        ]
+        quote = connection.ops.quote_name
+        row = '(%s)' % ', '.join(['%s'] * len(fields))
+        sql = 'INSERT INTO %s (%s) VALUES %s ON CONFLICT DO NOTHING RETURNING %s, %s' % (
+            quote(meta.db_table),
+            ', '.join(quote(f.column) for f in fields),
+            ', '.join([row] * len(articles)),
+            quote(meta.get_field('title').column),
+            quote(meta.get_field('source_name').column),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return set(cursor.fetchall())
+    
     def fetch_and_save(self, country='us', page_size=10):
         """
         Main function - fetch and save
@@ -6,23 +6,48 @@
 const API = {
     baseURL: '/api',
     
+    // Last ETag and parsed body per GET endpoint, for conditional requests
+    etagCache: new Map(),
+    etagCacheSize: 100,
+    
     async request(endpoint, options = {}) {
+        const method = (options.method || 'GET').toUpperCase();
+        const cached = method === 'GET' ? this.etagCache.get(endpoint) : null;
+        
         try {
             const response = await fetch(`${this.baseURL}${endpoint}`, {
+                ...options,
                 headers: {
                     'Content-Type': 'application/json',
+                    ...(cached ? { 'If-None-Match': cached.etag } : {}),
                     ...options.headers
-                },
-                ...options
+                }
             });
             
+            // Unchanged since the last fetch - reuse the body we already have
+            if (response.status === 304 && cached) {
+                return cached.data;
+            }
+            
             if (!response.ok) {
                 const error = new Error(`HTTP ${response.status}`);
                 error.status = response.status;
                 throw error;
             }
             
-            return await response.json();
+            const data = await response.json();
+            
+            const etag = response.headers.get('ETag');
+            if (method === 'GET' && etag) {
+                this.etagCache.delete(endpoint);
+                this.etagCache.set(endpoint, { etag, data });
+                // Drop the oldest entry once full (Map keeps insertion order)
+                if (this.etagCache.size > this.etagCacheSize) {
+                    this.etagCache.delete(this.etagCache.keys().next().value);
+                }
+            }
+            
+            return data;
         } catch (error) {
             console.error(`API Error (${endpoint}):`, error);
             throw error;
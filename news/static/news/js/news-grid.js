@@ -1,6 +1,7 @@
 const NewsGrid = {
     container: null,
-    currentPage: 1,
+    nextCursor: null,
+    nextPage: null,
     hasMore: true,
     isLoading: false,
     filters: {},
@@ -18,15 +19,23 @@ const NewsGrid = {
         this.isLoading = true;
         
         if (reset) {
-            this.currentPage = 1;
+            this.nextCursor = null;
+            this.nextPage = null;
             UI.showLoading(this.container);
         }
         
         try {
+            // Keyset pagination: every "load more" costs the same as page 1
             const params = {
-                page: this.currentPage,
+                paginate: 'cursor',
                 ...this.filters
             };
+            // Search results are ranked, so the API answers them with page numbers
+            if (this.nextCursor) {
+                params.cursor = this.nextCursor;
+            } else if (this.nextPage) {
+                params.page = this.nextPage;
+            }
             
             const data = await API.getArticles(params);
             
@@ -34,7 +43,10 @@ const NewsGrid = {
                 this.container.innerHTML = '';
             }
             
-            this.renderArticles(data.results);
+            this.renderArticles(data.results, reset);
+            const next = data.next ? new URL(data.next, window.location.origin).searchParams : null;
+            this.nextCursor = next ? next.get('cursor') : null;
+            this.nextPage = next ? next.get('page') : null;
             this.hasMore = !!data.next;
             this.updateLoadMoreButton();
             
@@ -45,8 +57,8 @@ const NewsGrid = {
         }
     },
     
-    renderArticles(articles) {
-        if (articles.length === 0 && this.currentPage === 1) {
+    renderArticles(articles, firstPage) {
+        if (articles.length === 0 && firstPage) {
             UI.showEmpty(this.container, 'No articles found');
             return;
         }
@@ -174,7 +186,6 @@ const NewsGrid = {
     
     loadMore() {
         if (!this.isLoading && this.hasMore) {
-            this.currentPage++;
             this.load(false);
         }
     }
@@ -0,0 +1,173 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from django.db import transaction
+from django.db.models import Count, F, Sum, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Article, ArticleStat
+from .caching import STATS, bump
+
+# Fields a row needs to be counted
+STAT_FIELDS = ['source_name', 'bias_label', 'bias_score', 'published_at', 'is_active']
+
+ROW_DEFAULTS = {
+    'bias_label': 'unclassified',
+    'bias_score': 0.0,
+    'is_active': True,
+}
+
+
+def _value(row, field):
+    """Read a stat field from a model instance or a dict of field values"""
+    if isinstance(row, dict):
+        return row.get(field, ROW_DEFAULTS.get(field))
+    return getattr(row, field)
+
+
+def _day_key(published_at):
+    return timezone.localtime(published_at).date().isoformat()
+
+
+def _keys(row):
+    """Every (dimension, key) counter a row contributes to"""
+    return [
+        ('total', ''),
+        ('source', _value(row, 'source_name')),
+        ('bias', _value(row, 'bias_label')),
+        ('day', _day_key(_value(row, 'published_at'))),
+    ]
+
+
+def _add(deltas, rows, sign):
+    for row in rows:
+        active = sign if _value(row, 'is_active') else 0
+        score = sign * (_value(row, 'bias_score') or 0.0)
+        for key in _keys(row):
+            delta = deltas[key]
+            delta[0] += sign
+            delta[1] += active
+            delta[2] += score
+
+
+def _apply(deltas):
+    """Apply {(dimension, key): [count, active, score_sum]} with atomic increments"""
+    deltas = {key: delta for key, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return
+    with transaction.atomic():
+        ArticleStat.objects.bulk_create(
+            [ArticleStat(dimension=dimension, key=key) for dimension, key in deltas],
+            ignore_conflicts=True,
+        )
+        for (dimension, key), (count, active, score) in deltas.items():
+            ArticleStat.objects.filter(dimension=dimension, key=key).update(
+                article_count=F('article_count') + count,
+                active_count=F('active_count') + active,
+                bias_score_sum=F('bias_score_sum') + score,
+            )
+        bump(STATS)
+
+
+def record_added(rows):
+    """Count newly inserted articles"""
+    deltas = defaultdict(lambda: [0, 0, 0.0])
+    _add(deltas, rows, 1)
+    _apply(deltas)
+
+
+def record_removed(rows):
+    """Un-count deleted articles"""
+    deltas = defaultdict(lambda: [0, 0, 0.0])
+    _add(deltas, rows, -1)
+    _apply(deltas)
+
+
+def record_changed(old_rows, new_rows):
+    """Move articles whose source, bias, date or active flag changed"""
+    deltas = defaultdict(lambda: [0, 0, 0.0])
+    _add(deltas, old_rows, -1)
+    _add(deltas, new_rows, 1)
+    _apply(deltas)
+
+
+def snapshot(queryset):
+    """Current stat field values, for record_changed()"""
+    return list(queryset.values(*STAT_FIELDS))
+
+
+def get_stats(now=None):
+    """
+    Payload for /api/articles/stats/, read from the counters
+    
+    last_7_days is a rolling window: whole days come from the day counters,
+    the partial first day is one indexed range count.
+    """
+    now = now or timezone.now()
+    stats = {(s.dimension, s.key): s for s in ArticleStat.objects.filter(
+        Q(dimension__in=['total', 'bias']) |
+        Q(dimension='day', key__gte=_day_key(now - timedelta(days=7)))
+    )}
+    
+    total_row = stats.get(('total', ''))
+    total = total_row.article_count if total_row else 0
+    avg_bias = total_row.bias_score_sum / total if total else None
+    
+    by_source = ArticleStat.objects.filter(dimension='source', article_count__gt=0)\
+        .order_by('-article_count', 'key')\
+        .values_list('key', 'article_count')[:10]
+    
+    by_bias = sorted(
+        (s.key, s.article_count) for (dimension, _), s in stats.items()
+        if dimension == 'bias' and s.article_count > 0
+    )
+    
+    cutoff = now - timedelta(days=7)
+    cutoff_day = timezone.localtime(cutoff).date()
+    next_midnight = timezone.make_aware(datetime.combine(cutoff_day + timedelta(days=1), time.min))
+    last_7_days = Article.objects.filter(
+        published_at__gte=cutoff, published_at__lt=next_midnight
+    ).count() + sum(
+        s.article_count for (dimension, key), s in stats.items()
+        if dimension == 'day' and key > cutoff_day.isoformat()
+    )
+    
+    return {
+        'total_articles': total,
+        'active_articles': total_row.active_count if total_row else 0,
+        'last_7_days_added': last_7_days,
+        'average_bias_score': round(avg_bias, 2) if avg_bias else 0,
+        'by_source': [{'source_name': name, 'count': count} for name, count in by_source],
+        'by_bias': [{'bias_label': label, 'count': count} for label, count in by_bias],
+    }
+
+
+def rebuild():
+    """Recompute every counter from the articles table"""
+    active = Count('id', filter=Q(is_active=True))
+    counters = []
+    
+    total = Article.objects.aggregate(count=Count('id'), active=active, score=Sum('bias_score'))
+    counters.append(ArticleStat(
+        dimension='total', key='',
+        article_count=total['count'], active_count=total['active'], bias_score_sum=total['score'] or 0.0,
+    ))
+    
+    groupings = [
+        ('source', 'source_name', Article.objects.values('source_name')),
+        ('bias', 'bias_label', Article.objects.values('bias_label')),
+        ('day', 'day', Article.objects.annotate(day=TruncDate('published_at')).values('day')),
+    ]
+    for dimension, field, queryset in groupings:
+        for row in queryset.annotate(count=Count('id'), active=active, score=Sum('bias_score')).order_by():
+            key = row[field].isoformat() if dimension == 'day' else row[field]
+            counters.append(ArticleStat(
+                dimension=dimension, key=key,
+                article_count=row['count'], active_count=row['active'], bias_score_sum=row['score'] or 0.0,
+            ))
+    
+    with transaction.atomic():
+        ArticleStat.objects.all().delete()
+        ArticleStat.objects.bulk_create(counters, batch_size=1000)
+        bump(STATS)
+    return len(counters)
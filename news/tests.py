@@ -1,3 +1,872 @@
-from django.test import TestCase
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from unittest import mock
+from urllib.parse import urlparse, parse_qs
 
-# Create your tests here.
+import requests
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from interactions.models import Upvote
+from . import stats
+from .caching import invalidate_articles
+from .http import close_sessions, get_pool_settings, get_session, get_timeout, pool_stats
+from .ingest import ConcurrentNewsFetcher, build_targets
+from .management.commands.run_ingestor import Command as RunIngestorCommand
+from .ml_client import BiasPredictionClient, CircuitBreaker, MLServiceUnavailable, PredictionCache
+from .models import Article, ArticleStat
+from .pagination import ArticlePagination
+from .search import search_articles
+from .serializers import ArticleListSerializer, article_list_columns, serialize_article_rows
+from .service import PoliticalNewsService
+
+
+class StubNewsAPIHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for NewsAPI /top-headlines"""
+    
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        
+        time.sleep(server.delay)
+        query = parse_qs(urlparse(self.path).query)
+        country = query['country'][0]
+        page = int(query['page'][0])
+        page_size = int(query['pageSize'][0])
+        body = json.dumps({
+            'status': 'ok',
+            'articles': [
+                {
+                    'title': f'{country} page {page} story {i}',
+                    'source': {'name': 'Stub'},
+                    'url': f'https://stub.test/{country}/{page}/{i}',
+                    'publishedAt': '2026-01-01T00:00:00Z',
+                }
+                for i in range(page_size)
+            ],
+        }).encode()
+        
+        with server.lock:
+            server.in_flight -= 1
+        
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class ConcurrentNewsFetcherTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), StubNewsAPIHandler)
+        cls.server.lock = threading.Lock()
+        cls.server.delay = 0.05
+        cls.server.in_flight = 0
+        cls.server.max_in_flight = 0
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}/v2'
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+    
+    def fetch_all(self, targets, concurrency):
+        async def collect():
+            fetcher = ConcurrentNewsFetcher(service, concurrency=concurrency, rate_per_host=1000)
+            return [item async for item in fetcher.fetch(targets, page_size=3)]
+        
+        with override_settings(NEWS_API_KEY='test', NEWS_API_BASE_URL=self.base_url):
+            service = PoliticalNewsService()
+            return asyncio.run(collect())
+    
+    def test_fetches_every_target(self):
+        targets = build_targets(['us', 'gb', 'ca'], 2)
+        results = self.fetch_all(targets, concurrency=4)
+        
+        self.assertEqual(sorted((c, p) for c, p, _ in results), sorted(targets))
+        for country, page, articles in results:
+            self.assertEqual(len(articles), 3)
+            self.assertTrue(articles[0]['title'].startswith(f'{country} page {page}'))
+    
+    def test_respects_concurrency_limit(self):
+        self.server.max_in_flight = 0
+        self.fetch_all(build_targets(['us', 'gb', 'ca', 'de'], 2), concurrency=2)
+        
+        self.assertLessEqual(self.server.max_in_flight, 2)
+
+
+def newsapi_article(index, **overrides):
+    """One NewsAPI article dict"""
+    return {
+        'title': f'Story {index}',
+        'source': {'name': 'Wire'},
+        'description': f'Body {index}',
+        'url': f'https://wire.test/{index}',
+        'publishedAt': '2026-01-01T00:00:00Z',
+        **overrides,
+    }
+
+
+@override_settings(NEWS_API_KEY='test')
+class BulkSaveArticlesTests(TestCase):
+    """bulk_save_articles reports exactly what it wrote"""
+    
+    def setUp(self):
+        self.service = PoliticalNewsService()
+    
+    def test_insert_skip_and_dedupe(self):
+        payload = [
+            newsapi_article(1),
+            newsapi_article(2),
+            newsapi_article(2),  # same url in the batch
+            newsapi_article(3, url='https://wire.test/3-mirror', title='Story 1'),  # same title + source
+            newsapi_article(4, title='[Removed]'),
+        ]
+        result = self.service.bulk_save_articles(payload)
+        
+        self.assertEqual((result['saved'], result['skipped'], result['errors']), (2, 3, 0))
+        self.assertEqual(Article.objects.count(), 2)
+        
+        # Everything already stored
+        result = self.service.bulk_save_articles([newsapi_article(1), newsapi_article(2)])
+        self.assertEqual((result['saved'], result['skipped']), (0, 2))
+    
+    def test_update_conflicts(self):
+        self.service.bulk_save_articles([newsapi_article(1)])
+        result = self.service.bulk_save_articles(
+            [newsapi_article(1, description='Rewritten'), newsapi_article(2)],
+            predictions=[(0.5, 'right'), None],
+            update_conflicts=True,
+        )
+        
+        self.assertEqual((result['saved'], result['updated'], result['skipped']), (1, 1, 0))
+        article = Article.objects.get(url='https://wire.test/1')
+        self.assertEqual((article.content, article.bias_label), ('Rewritten', 'right'))
+        self.assertTrue(Article.objects.get(url='https://wire.test/2').needs_rescore)
+    
+    def test_row_lost_to_concurrent_writer_is_not_counted(self):
+        real_insert = self.service._insert_ignoring_conflicts
+        
+        def racing_insert(articles):
+            # Another ingestor commits the same url between lookup and insert
+            Article.objects.bulk_create([Article(
+                title='Raced', source_name='Other', url=articles[0].url, published_at=timezone.now(),
+            )])
+            return real_insert(articles)
+        
+        with mock.patch.object(self.service, '_insert_ignoring_conflicts', side_effect=racing_insert):
+            result = self.service.bulk_save_articles([newsapi_article(1), newsapi_article(2)])
+        
+        self.assertEqual((result['saved'], result['skipped']), (1, 1))
+        self.assertEqual(Article.objects.get(url='https://wire.test/1').title, 'Raced')
+        # Only our row reached the rollups (the racing writer counts its own)
+        self.assertEqual(ArticleStat.objects.get(dimension='total').article_count, 1)
+        self.assertEqual(ArticleStat.objects.get(dimension='source', key='Wire').article_count, 1)
+    
+    def test_blank_urls_are_not_matched(self):
+        result = self.service.bulk_save_articles([newsapi_article(1, url=None), newsapi_article(2)])
+        self.assertEqual((result['saved'], result['skipped']), (2, 0))
+        
+        # Not a batch duplicate, and never matched to (or overwriting) the stored
+        # blank-url row - the unique url constraint alone skips it
+        result = self.service.bulk_save_articles(
+            [newsapi_article(3, url=None), newsapi_article(4)], update_conflicts=True,
+        )
+        self.assertEqual((result['saved'], result['updated'], result['skipped']), (1, 0, 1))
+        self.assertEqual(Article.objects.get(url='').title, 'Story 1')
+
+
+@override_settings(NEWS_API_KEY='test')
+class ArticleStatTests(TestCase):
+    """Incremental rollups agree with a full rebuild"""
+    
+    def counters(self):
+        return {
+            (stat.dimension, stat.key): (stat.article_count, stat.active_count, round(stat.bias_score_sum, 6))
+            for stat in ArticleStat.objects.all()
+            if stat.article_count or stat.active_count
+        }
+    
+    def test_incremental_matches_rebuild(self):
+        service = PoliticalNewsService()
+        service.bulk_save_articles(
+            [newsapi_article(i, source={'name': f'Source {i % 3}'}) for i in range(9)],
+            predictions=[(0.5, 'right') if i % 2 else (-0.5, 'left') for i in range(9)],
+        )
+        article = Article.objects.get(url='https://wire.test/4')
+        old_rows = stats.snapshot(Article.objects.filter(pk=article.pk))
+        article.is_active = False
+        article.bias_label = 'center'
+        article.save()
+        stats.record_changed(old_rows, [article])
+        
+        removed = Article.objects.filter(url='https://wire.test/7')
+        stats.record_removed(stats.snapshot(removed))
+        removed.delete()
+        
+        incremental = self.counters()
+        stats.rebuild()
+        self.assertEqual(incremental, self.counters())
+        self.assertEqual(stats.get_stats()['total_articles'], 8)
+
+
+class FakeResponse:
+    """Just enough of requests.Response for the ML client"""
+    
+    def __init__(self, status_code=200, data=None):
+        self.status_code = status_code
+        self.data = data
+    
+    def json(self):
+        return self.data
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error", response=self)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class PredictionCacheTests(SimpleTestCase):
+    """A broken shared cache degrades to misses"""
+    
+    def test_cache_errors_are_misses(self):
+        client = BiasPredictionClient(base_url='http://ml.test')
+        client.session = mock.Mock()
+        client.session.post.return_value = FakeResponse(data={'bias_score': 0.4, 'bias_category': 'right'})
+        
+        with mock.patch('news.ml_client.cache') as broken:
+            broken.get_many.side_effect = ConnectionError('cache down')
+            broken.set_many.side_effect = ConnectionError('cache down')
+            self.assertEqual(client._predict_one('Title', 'Source'), (0.4, 'right'))
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+        
+        # Served from the local tier afterwards
+        client.session.post.reset_mock()
+        self.assertEqual(client._predict_one('Title', 'Source'), (0.4, 'right'))
+        client.session.post.assert_not_called()
+    
+    def test_keys_normalize_text_and_version(self):
+        cache_v1, cache_v2 = PredictionCache('v1'), PredictionCache('v2')
+        self.assertEqual(cache_v1.make_key(' Senate  Votes', 'CNN'), cache_v1.make_key('senate votes', 'cnn'))
+        self.assertNotEqual(cache_v1.make_key('a', 'b'), cache_v2.make_key('a', 'b'))
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    """closed -> open -> half_open -> closed / re-open with back-off"""
+    
+    def setUp(self):
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, max_reset_timeout=25)
+        self.clock = mock.patch('news.ml_client.time.monotonic', return_value=1000.0)
+        self.now = self.clock.start()
+        self.addCleanup(self.clock.stop)
+    
+    def fail(self, times):
+        for _ in range(times):
+            self.breaker.record_failure()
+    
+    def test_opens_after_threshold(self):
+        self.fail(2)
+        self.assertTrue(self.breaker.allow_request())
+        self.fail(1)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(self.breaker.allow_request())
+    
+    def test_success_resets_failure_count(self):
+        self.fail(2)
+        self.breaker.record_success()
+        self.fail(2)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+    
+    def test_half_open_probe(self):
+        self.fail(3)
+        self.now.return_value = 1010.0
+        self.assertTrue(self.breaker.allow_request())
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        # Only one probe at a time
+        self.assertFalse(self.breaker.allow_request())
+        
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+    
+    def test_failed_probe_backs_off(self):
+        self.fail(3)
+        for expected_timeout in (20, 25, 25):
+            self.now.return_value += self.breaker.reset_timeout
+            self.assertTrue(self.breaker.allow_request())
+            self.fail(1)
+            self.assertEqual((self.breaker.state, self.breaker.reset_timeout), (CircuitBreaker.OPEN, expected_timeout))
+        
+        self.now.return_value += 25
+        self.breaker.allow_request()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.reset_timeout, 10)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class BreakerFailureClassificationTests(SimpleTestCase):
+    """Only connection errors, timeouts and 5xx trip the breaker"""
+    
+    def setUp(self):
+        self.client = BiasPredictionClient(base_url='http://ml.test')
+        self.client.cache.clear_local()
+        self.client.breaker = CircuitBreaker(failure_threshold=1)
+        self.client.session = mock.Mock()
+    
+    def test_client_errors_do_not_open(self):
+        articles = [('A', 'S'), ('B', 'S')]
+        for response in (FakeResponse(422), FakeResponse(data={'predictions': []})):
+            self.client.session.post.return_value = response
+            with self.assertRaises(Exception):
+                self.client._request_batch(articles)
+            self.assertEqual(self.client.breaker.state, CircuitBreaker.CLOSED)
+        
+        self.client.session.post.return_value = FakeResponse(400)
+        self.assertIsNone(self.client._predict_one('A', 'S'))
+        self.assertEqual(self.client.breaker.state, CircuitBreaker.CLOSED)
+    
+    def test_server_errors_open(self):
+        self.client.session.post.return_value = FakeResponse(503)
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.client._request_batch([('A', 'S'), ('B', 'S')])
+        self.assertEqual(self.client.breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(MLServiceUnavailable):
+            self.client._request_batch([('A', 'S'), ('B', 'S')])
+    
+    def test_timeouts_open(self):
+        self.client.session.post.side_effect = requests.exceptions.ReadTimeout()
+        self.assertIsNone(self.client._predict_one('A', 'S'))
+        self.assertEqual(self.client.breaker.state, CircuitBreaker.OPEN)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class PredictManyTests(SimpleTestCase):
+    """Failed batches are split, then scored one by one"""
+    
+    def setUp(self):
+        self.client = BiasPredictionClient(base_url='http://ml.test')
+        self.client.cache = PredictionCache(model_version='predict-many-test')
+        self.client.session = mock.Mock()
+        self.client.session.post.side_effect = self.respond
+        self.batch_sizes = []
+    
+    def respond(self, url, json, timeout):
+        # The service rejects anything titled 'Bad'
+        if url.endswith('/predict/batch'):
+            self.batch_sizes.append(len(json['articles']))
+            if any(article['title'] == 'Bad' for article in json['articles']):
+                return FakeResponse(422)
+            return FakeResponse(data={'predictions': [
+                {'bias_score': 0.1, 'bias_category': 'center'} for _ in json['articles']
+            ]})
+        if json['title'] == 'Bad':
+            return FakeResponse(400)
+        return FakeResponse(data={'bias_score': 0.1, 'bias_category': 'center'})
+    
+    def test_split_and_fallback(self):
+        articles = [(f'Story {i}', 'Wire') for i in range(8)]
+        articles[5] = ('Bad', 'Wire')
+        
+        results = self.client.predict_many(articles, batch_size=4)
+        
+        self.assertEqual(results, [None if i == 5 else (0.1, 'center') for i in range(8)])
+        # 4 ok, 4 failed -> halves of 2: one fails (then per article), one ok
+        self.assertEqual(self.batch_sizes, [4, 4, 2, 2])
+        
+        # Everything scored is cached; only the failure is retried
+        self.client.session.post.reset_mock()
+        self.assertEqual(self.client.predict_many(articles, batch_size=4)[5], None)
+        self.assertEqual(self.client.session.post.call_count, 1)
+
+
+class KeepAliveStubHandler(StubNewsAPIHandler):
+    protocol_version = 'HTTP/1.1'
+
+
+@override_settings(HTTP_POOLS={'default': {'pool_maxsize': 2}, 'stub': {'read_timeout': 5}})
+class SharedSessionTests(SimpleTestCase):
+    """Named pools are shared and keep connections alive"""
+    
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveStubHandler)
+        self.server.lock = threading.Lock()
+        self.server.delay = 0
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.addCleanup(close_sessions)
+    
+    def test_settings_merge_over_defaults(self):
+        config = get_pool_settings('stub')
+        self.assertEqual((config['pool_maxsize'], config['read_timeout'], config['pool_connections']), (2, 5, 4))
+        self.assertEqual(get_timeout('stub'), (3.05, 5))
+        self.assertEqual(get_timeout('stub', read_timeout=60), (3.05, 60))
+    
+    def test_session_is_shared_and_reuses_connections(self):
+        session = get_session('stub')
+        self.assertIs(get_session('stub'), session)
+        self.assertIsNot(get_session('other'), session)
+        
+        url = f'http://127.0.0.1:{self.server.server_port}/v2/top-headlines?country=us&page=1&pageSize=1'
+        for _ in range(5):
+            self.assertEqual(session.get(url, timeout=get_timeout('stub')).status_code, 200)
+        
+        stats = pool_stats(session)
+        self.assertEqual((stats['requests'], stats['connections_opened']), (5, 1))
+        self.assertEqual(stats['reuse_ratio'], 0.8)
+
+
+@mock.patch('news.management.commands.run_ingestor.signal.signal')
+class RunIngestorTests(SimpleTestCase):
+    """Standby while another replica ingests, clean exit on SIGTERM"""
+    
+    def run_ingestor(self, **options):
+        out = StringIO()
+        call_command('run_ingestor', interval=3600, jitter=0, stdout=out, **options)
+        return out.getvalue()
+    
+    @mock.patch.object(RunIngestorCommand, 'run_cycle')
+    @mock.patch.object(RunIngestorCommand, 'acquire_lock', return_value=False)
+    def test_lock_held_elsewhere(self, acquire_lock, run_cycle, signal_handler):
+        output = self.run_ingestor(once=True)
+        
+        run_cycle.assert_not_called()
+        self.assertIn('Another replica holds the ingestion lock', output)
+    
+    @mock.patch.object(RunIngestorCommand, 'release_lock')
+    @mock.patch.object(RunIngestorCommand, 'acquire_lock', return_value=True)
+    def test_sigterm_finishes_cycle_then_exits(self, acquire_lock, release_lock, signal_handler):
+        def cycle(command, options):
+            # SIGTERM arrives mid-cycle
+            command.request_stop(15, None)
+        
+        with mock.patch.object(RunIngestorCommand, 'run_cycle', autospec=True, side_effect=cycle) as run_cycle:
+            started = time.monotonic()
+            output = self.run_ingestor()
+        
+        # No sleep for the 3600s interval, one cycle, lock released
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(run_cycle.call_count, 1)
+        release_lock.assert_called_once()
+        self.assertIn('Ingestor stopped', output)
+    
+    @mock.patch('news.management.commands.run_ingestor.call_command', side_effect=RuntimeError('NewsAPI down'))
+    def test_failed_cycle_does_not_raise(self, call, signal_handler):
+        out = StringIO()
+        RunIngestorCommand(stdout=out).run_cycle({'count': 1, 'countries': 'us', 'pages': 1})
+        self.assertIn('Cycle failed: NewsAPI down', out.getvalue())
+
+
+class IngestorLockTests(TransactionTestCase):
+    """Only one replica holds the advisory lock"""
+    
+    def setUp(self):
+        if connection.vendor != 'postgresql':
+            self.skipTest('advisory locks need PostgreSQL')
+    
+    def command(self):
+        command = RunIngestorCommand()
+        command.lock_connection = None
+        self.addCleanup(command.release_lock)
+        return command
+    
+    def test_second_replica_waits_for_release(self):
+        first, second = self.command(), self.command()
+        
+        self.assertTrue(first.acquire_lock())
+        self.assertTrue(first.acquire_lock())  # Re-entrant on the held connection
+        self.assertFalse(second.acquire_lock())
+        
+        first.release_lock()
+        self.assertTrue(second.acquire_lock())
+
+
+def create_article(index, published_at=None, **fields):
+    """One stored Article"""
+    return Article.objects.create(
+        title=f'Story {index}', source_name='Wire', url=f'https://wire.test/{index}',
+        published_at=published_at or timezone.now(), **fields,
+    )
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CursorPaginationTests(TestCase):
+    """?paginate=cursor walks (published_at, id) without skips or repeats"""
+    
+    def setUp(self):
+        cache.clear()
+        base = timezone.now() - timedelta(days=1)
+        # Two pairs share a timestamp, so id has to break the tie
+        minutes = [0, 1, 1, 2, 3, 3, 4]
+        self.articles = [create_article(i, base + timedelta(minutes=m)) for i, m in enumerate(minutes)]
+    
+    def page(self, **params):
+        with mock.patch.object(ArticlePagination, 'page_size', 2):
+            response = self.client.get('/api/articles/', {'paginate': 'cursor', **params})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+    
+    def test_pages_are_stable_under_inserts(self):
+        expected = [
+            article.id for article in
+            sorted(self.articles, key=lambda article: (article.published_at, article.id), reverse=True)
+        ]
+        
+        body = self.page()
+        self.assertNotIn('count', body)
+        seen = []
+        while True:
+            seen += [item['id'] for item in body['results']]
+            # Newer articles keep arriving between page requests
+            create_article(100 + len(seen))
+            if body['next_cursor'] is None:
+                break
+            self.assertIn(f"cursor={body['next_cursor']}", body['next'])
+            body = self.page(cursor=body['next_cursor'])
+        
+        self.assertEqual(seen, expected)
+    
+    def test_include_count_and_invalid_cursor(self):
+        self.assertEqual(self.page(include_count=1)['count'], len(self.articles))
+        
+        response = self.client.get('/api/articles/', {'paginate': 'cursor', 'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+    
+    def test_other_orderings_use_page_numbers(self):
+        body = self.page(ordering='bias_score')
+        self.assertEqual(body['count'], len(self.articles))
+        self.assertNotIn('next_cursor', body)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ArticleSearchTests(TestCase):
+    """?search= ranks full-text matches; blank values are ignored"""
+    
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.in_title = create_article(1, now - timedelta(days=2), title='Senate passes budget')
+        self.in_content = create_article(2, now - timedelta(days=1), content='The senate adjourned early')
+        self.unrelated = create_article(3, now, title='Local weather')
+    
+    def ids(self, params):
+        response = self.client.get('/api/articles/', params)
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.json()['results']]
+    
+    def test_title_matches_rank_first(self):
+        response = self.client.get('/api/articles/', {'search': 'senate'})
+        results = response.json()['results']
+        
+        self.assertEqual([item['id'] for item in results], [self.in_title.id, self.in_content.id])
+        self.assertGreater(results[0]['search_rank'], results[1]['search_rank'])
+        # An explicit ?ordering= wins over relevance
+        self.assertEqual(
+            self.ids({'search': 'senate', 'ordering': '-published_at'}),
+            [self.in_content.id, self.in_title.id],
+        )
+    
+    def test_blank_search_uses_default_ordering(self):
+        newest_first = [self.unrelated.id, self.in_content.id, self.in_title.id]
+        for value in ('', ' ', '  \t'):
+            with self.subTest(search=value):
+                self.assertEqual(self.ids({'search': value}), newest_first)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class FuzzyFilterTests(TestCase):
+    """?fuzzy_source= / ?fuzzy_title= trigram matches and ?similarity="""
+    
+    def setUp(self):
+        cache.clear()
+        now = timezone.now()
+        self.exact = create_article(1, now - timedelta(days=2), source_name='Reuters')
+        self.partial = create_article(2, now - timedelta(days=1), source_name='Reuters Africa')
+        self.other = create_article(3, now, source_name='Wire')
+    
+    def ids(self, params):
+        response = self.client.get('/api/articles/', params)
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.json()['results']]
+    
+    def test_best_match_first_and_threshold(self):
+        self.assertEqual(self.ids({'fuzzy_source': 'reuters'}), [self.exact.id, self.partial.id])
+        self.assertEqual(self.ids({'fuzzy_source': 'reuters', 'similarity': '0.9'}), [self.exact.id])
+        # Below the index's threshold is clamped to it
+        self.assertEqual(self.ids({'fuzzy_source': 'reuters', 'similarity': '0.01'}), [self.exact.id, self.partial.id])
+    
+    def test_blank_fuzzy_values_use_default_ordering(self):
+        newest_first = [self.other.id, self.partial.id, self.exact.id]
+        for param in ('fuzzy_source', 'fuzzy_title'):
+            for value in ('', ' ', '  \t'):
+                with self.subTest(param=param, value=value):
+                    self.assertEqual(self.ids({param: value}), newest_first)
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    API_CACHE_ENABLED=True,
+)
+class ResponseCacheTests(TestCase):
+    """Cached article responses die with the generations they were built under"""
+    
+    def setUp(self):
+        cache.clear()
+        self.article = create_article(1)
+        self.other = create_article(2)
+    
+    def get(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response
+    
+    def invalidate(self, article_ids=(), listing=True):
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_articles(article_ids, listing=listing)
+    
+    def test_hit_needs_no_queries(self):
+        self.assertEqual(self.get('/api/articles/')['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.get('/api/articles/')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        # Another query string is another entry
+        self.assertEqual(self.get('/api/articles/?bias=left')['X-Cache'], 'MISS')
+    
+    def test_listing_write_invalidates_list(self):
+        self.get('/api/articles/')
+        Article.objects.filter(pk=self.article.pk).update(title='Rewritten')
+        self.assertEqual(self.get('/api/articles/')['X-Cache'], 'HIT')
+        
+        self.invalidate([self.article.pk])
+        response = self.get('/api/articles/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertIn('Rewritten', [item['title'] for item in response.json()['results']])
+    
+    def test_detail_generations_are_per_article(self):
+        url, other_url = f'/api/articles/{self.article.pk}/', f'/api/articles/{self.other.pk}/'
+        self.get('/api/articles/')
+        self.get(url)
+        self.get(other_url)
+        
+        # e.g. a new comment: only that article's detail changes
+        self.invalidate([self.article.pk], listing=False)
+        self.assertEqual(self.get(url)['X-Cache'], 'MISS')
+        self.assertEqual(self.get(other_url)['X-Cache'], 'HIT')
+        self.assertEqual(self.get('/api/articles/')['X-Cache'], 'HIT')
+    
+    @override_settings(API_CACHE_ENABLED=False)
+    def test_per_process_cache_stores_nothing(self):
+        self.get('/api/articles/')
+        Article.objects.filter(pk=self.article.pk).update(title='Rewritten')
+        
+        # No bump reached this process, but nothing was stored either
+        response = self.get('/api/articles/')
+        self.assertNotIn('X-Cache', response)
+        self.assertIn('Rewritten', [item['title'] for item in response.json()['results']])
+    
+    def test_error_responses_are_not_cached(self):
+        response = self.client.get(f'/api/articles/{self.other.pk + 100}/')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('X-Cache', response)
+        self.assertNotIn('ETag', response)
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    API_CACHE_ENABLED=True,
+)
+class ConditionalGetTests(TestCase):
+    """ETag / Last-Modified revalidation of cached article responses"""
+    
+    def setUp(self):
+        cache.clear()
+        self.article = create_article(1)
+        self.url = f'/api/articles/{self.article.pk}/'
+    
+    def test_if_none_match_is_answered_without_queries(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['X-Cache'], 'REVALIDATED')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=f'W/{etag}').status_code, 304)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_articles([self.article.pk], listing=False)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+    
+    def test_if_modified_since(self):
+        last_modified = self.client.get('/api/articles/')['Last-Modified']
+        response = self.client.get('/api/articles/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+        # If-None-Match takes precedence
+        response = self.client.get('/api/articles/', HTTP_IF_MODIFIED_SINCE=last_modified, HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, 200)
+    
+    @override_settings(API_CACHE_ENABLED=False)
+    def test_no_validators_without_a_shared_cache(self):
+        response = self.client.get(self.url)
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+        
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 200)
+    
+    def get_at(self, moment, url, **headers):
+        with mock.patch('django.utils.timezone.now', return_value=moment), \
+                mock.patch('news.caching.time.time', return_value=moment.timestamp()):
+            return self.client.get(url, **headers)
+    
+    def test_detail_expires_24h_after_publication(self):
+        published_at = datetime(2026, 3, 1, 12, 0, tzinfo=dt_timezone.utc)
+        article = create_article(2, published_at)
+        url = f'/api/articles/{article.pk}/'
+        
+        first = self.get_at(published_at + timedelta(hours=11), url)
+        self.assertEqual(first.json()['days_since_published'], 0)
+        
+        # Past UTC midnight, but still within the first 24h
+        response = self.get_at(published_at + timedelta(hours=23), url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+        
+        response = self.get_at(published_at + timedelta(hours=24, minutes=1), url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['days_since_published'], 1)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class FastListPathTests(TestCase):
+    """serialize_article_rows renders byte for byte what ArticleListSerializer does"""
+    
+    def setUp(self):
+        cache.clear()
+        published_at = timezone.now().replace(microsecond=123456)
+        create_article(1, published_at, title='Senate — “quoted” café', bias_label='left', bias_score=-0.25)
+        create_article(2, published_at - timedelta(hours=3), title='Senate vote', image_url='https://wire.test/2.jpg')
+        create_article(3, published_at - timedelta(days=1), bias_label='not-a-choice', bias_score=1.0)
+    
+    def assertSameOutput(self, queryset):
+        render = JSONRenderer().render
+        rows = list(queryset.values(*article_list_columns(queryset)))
+        expected = render(ArticleListSerializer(list(queryset), many=True).data)
+        self.assertEqual(render(serialize_article_rows(rows)), expected)
+    
+    def test_plain_rows(self):
+        self.assertSameOutput(Article.objects.order_by('-published_at'))
+    
+    def test_search_rows(self):
+        queryset = search_articles(Article.objects.all(), 'senate', highlight=True).order_by('-search_rank')
+        self.assertSameOutput(queryset)
+    
+    def test_endpoint_uses_the_same_output(self):
+        response = self.client.get('/api/articles/')
+        expected = ArticleListSerializer(list(Article.objects.order_by('-published_at')), many=True).data
+        self.assertEqual(response.json()['results'], json.loads(JSONRenderer().render(expected)))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class SparseFieldsTests(TestCase):
+    """?fields= / ?exclude= shape the output and the columns selected"""
+    
+    def setUp(self):
+        cache.clear()
+        self.article = create_article(1, content='Long body')
+    
+    def get(self, path, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        sql = ' '.join(query['sql'] for query in queries.captured_queries)
+        return response.json(), sql
+    
+    def test_list_fields_and_exclude(self):
+        body, sql = self.get('/api/articles/', {'fields': 'id, title'})
+        self.assertEqual(list(body['results'][0]), ['id', 'title'])
+        self.assertNotIn('"image_url"', sql)
+        
+        body, _ = self.get('/api/articles/', {'exclude': 'image_url,bias_display'})
+        self.assertEqual(
+            list(body['results'][0]),
+            ['id', 'title', 'source_name', 'published_at', 'bias_label', 'bias_score'],
+        )
+    
+    def test_detail_defers_excluded_columns(self):
+        body, sql = self.get(f'/api/articles/{self.article.pk}/', {'exclude': 'content,summary'})
+        self.assertNotIn('content', body)
+        self.assertNotIn('summary', body)
+        self.assertNotIn('"content"', sql)
+        
+        body, _ = self.get(f'/api/articles/{self.article.pk}/', {'fields': 'summary,days_since_published'})
+        self.assertEqual(body, {'summary': 'Long body', 'days_since_published': 0})
+    
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get('/api/articles/', {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['fields'][0])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class MyUpvoteTests(TestCase):
+    """?include=my_upvote costs one Upvote query per page"""
+    
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(email='reader@example.com')
+        self.articles = [create_article(i) for i in range(5)]
+        self.upvoted = {self.articles[1].id, self.articles[3].id}
+        for article_id in self.upvoted:
+            Upvote.objects.create(user=self.user, article_id=article_id)
+    
+    def upvote_queries(self, path):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response, [q for q in queries.captured_queries if '"interactions_upvote"' in q['sql']]
+    
+    def test_one_query_for_the_page(self):
+        self.client.force_login(self.user)
+        response, queries = self.upvote_queries('/api/articles/?include=my_upvote')
+        
+        self.assertEqual(len(queries), 1)
+        results = response.json()['results']
+        self.assertEqual({item['id'] for item in results if item['my_upvote']}, self.upvoted)
+        self.assertEqual(len(results), len(self.articles))
+    
+    def test_batch_status_endpoint(self):
+        self.client.force_login(self.user)
+        ids = ','.join(str(article.id) for article in self.articles)
+        response, queries = self.upvote_queries(f'/api/articles/my-upvotes/?ids={ids}')
+        
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(set(response.json()['upvoted_ids']), self.upvoted)
+    
+    def test_anonymous_include_is_ignored(self):
+        response, queries = self.upvote_queries('/api/articles/?include=my_upvote')
+        self.assertEqual(queries, [])
+        self.assertNotIn('my_upvote', response.json()['results'][0])
@@ -1,17 +1,27 @@
-from rest_framework import viewsets, filters, status
+from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Count, Avg
 from django.utils import timezone
-from datetime import timedelta
 
 from .models import Article
-from .serializers import ArticleSerializer, ArticleListSerializer
-from .filters import ArticleFilter
+from .serializers import (
+    ArticleSerializer, ArticleListSerializer,
+    article_columns, article_list_columns, serialize_article_rows,
+)
+from .filters import ArticleFilter, ArticleOrderingFilter
+from .pagination import ArticlePagination
+from .search import source_suggestions
+from .stats import get_stats
+from .caching import ARTICLES, STATS, article_generation, cache_response, user_generation
+from interactions.models import Upvote
 
 from django.shortcuts import render
 from django.conf import settings
+import time
+
+DAY_SECONDS = 60 * 60 * 24
 
 
 class ArticleViewSet(viewsets.ReadOnlyModelViewSet):
@@ -19,10 +29,10 @@ class ArticleViewSet(viewsets.ReadOnlyModelViewSet):
     API endpoint for viewing political news articles.
     
     Provides:
-    - List all articles (paginated, 20 per page)
+    - List all articles (paginated, 20 per page, page numbers or cursor)
     - Retrieve single article details
     - Filter by source, bias, date
-    - Search in titles and content
+    - Ranked full-text search in titles and content
     - Order by date or bias score
     - Statistics endpoint
     
@@ -30,32 +40,65 @@ class ArticleViewSet(viewsets.ReadOnlyModelViewSet):
     - /api/articles/ - List all articles
     - /api/articles/?source=CNN - Filter by source
     - /api/articles/?bias=left - Filter by bias
-    - /api/articles/?search=election - Search articles
+    - /api/articles/?fuzzy_source=reuter - Typo-tolerant source filter
+    - /api/articles/?search=election - Search articles (best match first)
+    - /api/articles/?search=election&highlight=1 - With highlighted snippets
     - /api/articles/?ordering=-published_at - Newest first
+    - /api/articles/?paginate=cursor - Keyset pagination (use next_cursor for more)
+    - /api/articles/?fields=id,title,bias_label - Only these fields
+    - /api/articles/?include=my_upvote - Add my_upvote per article (logged in)
     - /api/articles/5/ - Get article with ID 5
+    - /api/articles/5/?exclude=content,summary - Detail without the body
     - /api/articles/stats/ - Get database statistics
+    - /api/articles/sources/?q=fox - Source autocomplete
     """
     
     # Base queryset - only active articles, ordered by newest first
-    queryset = Article.objects.filter(is_active=True).order_by('-published_at')
+    # (search_vector is only read inside the database)
+    queryset = Article.objects.filter(is_active=True).defer('search_vector').order_by('-published_at')
+    
+    # Page numbers by default, keyset cursor with ?paginate=cursor
+    pagination_class = ArticlePagination
     
     # Filter backends
+    # ?search= is handled by ArticleFilter (Postgres full-text search)
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter,
+        ArticleOrderingFilter,
     ]
     
     # Use our custom filter class
     filterset_class = ArticleFilter
     
-    # Search fields (used by SearchFilter)
-    search_fields = ['title', 'content']
+    # Numeric ids only, so /api/articles/my-upvotes/ reaches the interactions app
+    lookup_value_regex = r'\d+'
     
     # Ordering fields (used by OrderingFilter)
     ordering_fields = ['published_at', 'bias_score']
     ordering = ['-published_at']  # Default ordering
     
+    # Responses are cached per query string and carry ETag / Last-Modified
+    # (see news/caching.py). last_7_days in stats is a rolling window, so
+    # that payload also changes with the clock; retrieve sets its own window.
+    cache_periods = {
+        'stats': settings.API_CACHE_STATS_TIMEOUT,
+    }
+    
+    def get_cache_generations(self):
+        """Generations the current action's response depends on"""
+        if self.action == 'stats':
+            return [STATS]
+        if self.action == 'retrieve':
+            return [article_generation(self.kwargs[self.lookup_url_kwarg or self.lookup_field])]
+        if self.action == 'list' and self.include_my_upvote():
+            return [ARTICLES, user_generation(self.request.user.id, 'upvotes')]
+        return [ARTICLES]
+    
+    def include_my_upvote(self):
+        """?include=my_upvote from a logged-in user"""
+        include = self.request.query_params.get('include', '').split(',')
+        return 'my_upvote' in include and self.request.user.is_authenticated
+    
     def get_serializer_class(self):
         """
         Use different serializers for different actions:
@@ -66,7 +109,85 @@ class ArticleViewSet(viewsets.ReadOnlyModelViewSet):
             return ArticleListSerializer
         return ArticleSerializer
     
+    def get_sparse_fields(self):
+        """
+        Fields requested with ?fields=id,title and/or ?exclude=content on
+        list and detail. Returns None when the full representation is wanted.
+        """
+        if self.action not in ('list', 'retrieve'):
+            return None
+        if not hasattr(self, '_sparse_fields'):
+            params = self.request.query_params
+            only = [name.strip() for name in params.get('fields', '').split(',') if name.strip()]
+            exclude = [name.strip() for name in params.get('exclude', '').split(',') if name.strip()]
+            
+            available = self.get_serializer_class().Meta.fields
+            unknown = [name for name in only + exclude if name not in available]
+            if unknown:
+                raise ValidationError({
+                    'fields': f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(available)}"
+                })
+            
+            fields = None
+            if only or exclude:
+                fields = [name for name in available if (not only or name in only) and name not in exclude]
+            self._sparse_fields = fields
+        return self._sparse_fields
+    
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+    
+    def get_queryset(self):
+        """Only load the columns a sparse detail response needs"""
+        queryset = super().get_queryset()
+        fields = self.get_sparse_fields() if self.action == 'retrieve' else None
+        if fields is not None:
+            queryset = queryset.only(*article_columns(fields))
+        return queryset
+    
+    @cache_response
+    def list(self, request, *args, **kwargs):
+        """
+        List articles through the fast path: only the list columns (or the
+        ?fields= subset) are selected and rows are serialized without
+        ModelSerializer overhead
+        """
+        fields = self.get_sparse_fields()
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = queryset.values(*article_list_columns(queryset, fields))
+        
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(self.serialize_rows(page, fields))
+        return Response(self.serialize_rows(rows, fields))
+    
+    def serialize_rows(self, rows, fields):
+        """Fast-path rows plus my_upvote, resolved for the whole page in one query"""
+        rows = list(rows)
+        data = serialize_article_rows(rows, fields)
+        if self.include_my_upvote():
+            upvoted = Upvote.upvoted_article_ids(self.request.user, [row['id'] for row in rows])
+            for item, row in zip(data, rows):
+                item['my_upvote'] = row['id'] in upvoted
+        return data
+    
+    @cache_response
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        fields = self.get_sparse_fields()
+        if fields is None or 'days_since_published' in fields:
+            # days_since_published moves every 24h after publication
+            published = instance.published_at.timestamp()
+            start = published + (time.time() - published) // DAY_SECONDS * DAY_SECONDS
+            self.cache_window = (start, start + DAY_SECONDS)
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+    
     @action(detail=False, methods=['get'])
+    @cache_response
     def stats(self, request):
         """
         Get database statistics.
@@ -76,42 +197,33 @@ class ArticleViewSet(viewsets.ReadOnlyModelViewSet):
         - Articles by source
         - Articles by bias
         - Recent activity
-        """
-        total = Article.objects.count()
-        
-        # Articles by source (top 10)
-        by_source = Article.objects.values('source_name')\
-            .annotate(count=Count('id'))\
-            .order_by('-count')[:10]
         
-        # Articles by bias
-        by_bias = Article.objects.values('bias_label')\
-            .annotate(count=Count('id'))\
-            .order_by('bias_label')
-        
-        # Recent activity (last 7 days)
-        last_7_days = Article.objects.filter(
-            published_at__gte=timezone.now() - timedelta(days=7)
-        ).count()
-        
-        # Average bias score
-        avg_bias = Article.objects.aggregate(Avg('bias_score'))['bias_score__avg']
-        
-        return Response({
-            'total_articles': total,
-            'last_7_days_added': last_7_days,
-            'average_bias_score': round(avg_bias, 2) if avg_bias else 0,
-            'by_source': list(by_source),
-            'by_bias': list(by_bias),
-            'timestamp': timezone.now().isoformat(),
-        })
+        Read from the ArticleStat rollups (see news/stats.py), so the cost
+        does not grow with the articles table.
+        """
+        now = timezone.now()
+        data = get_stats(now)
+        data['timestamp'] = now.isoformat()
+        return Response(data)
     
     @action(detail=False, methods=['get'])
+    @cache_response
     def sources(self, request):
         """
         Get list of all unique news sources.
         Useful for populating filter dropdowns in frontend.
+        
+        ?q=fox - autocomplete mode: up to ?limit= (default 10) sources
+        matching the text as a substring or with typos, best match first
         """
+        query = request.query_params.get('q', '').strip()
+        if query:
+            try:
+                limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+            except ValueError:
+                limit = 10
+            return Response(source_suggestions(Article.objects.all(), query, limit=limit))
+        
         sources = Article.objects.values_list('source_name', flat=True)\
             .distinct().order_by('source_name')
         return Response(list(sources))
@@ -9,24 +9,19 @@ from datetime import timedelta
 import json
 import logging
 
+from users.authentication import ClaimsJWTAuthentication
+from users.utils import PremiumService
+
 logger = logging.getLogger(__name__)
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
 def get_user_from_request(request):
-    """Extract user from JWT token in Authorization header"""
-    auth_header = request.headers.get('Authorization', '')
-    if not auth_header.startswith('Bearer '):
-        return None
-    
-    token = auth_header.split(' ')[1]
+    """Extract user from JWT token in Authorization header (from its claims when current)"""
     try:
-        from rest_framework_simplejwt.tokens import AccessToken
-        from users.models import User
-        access_token = AccessToken(token)
-        user_id = access_token.payload.get('user_id')
-        return User.objects.get(id=user_id)
+        result = ClaimsJWTAuthentication().authenticate(request)
     except Exception:
         return None
+    return result[0] if result else None
 
 def premium_page(request):
     """Premium pricing page"""
@@ -122,6 +117,7 @@ def stripe_webhook(request):
                 user.is_premium = True
                 user.premium_until = timezone.now() + timedelta(days=30)
                 user.save()
+                PremiumService.invalidate(user.id)
                 logger.info(f"✅ User {user.email} upgraded to premium!")
                 
             except User.DoesNotExist:
@@ -139,7 +135,7 @@ def premium_status(request):
         return JsonResponse({'is_premium': False}, status=401)
     
     return JsonResponse({
-        'is_premium': user.is_premium_active,
+        'is_premium': PremiumService.is_premium(user.id),
         'premium_until': user.premium_until,
     })
 
@@ -167,6 +163,7 @@ def stripe_webhook(request):
                 user.is_premium = True
                 user.premium_until = timezone.now() + timedelta(days=30)
                 user.save()
+                PremiumService.invalidate(user.id)
                 logger.info(f"✅ User {user.email} upgraded to premium!")
             except User.DoesNotExist:
                 logger.error(f"User {user_id} not found")
@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.utils.translation import gettext_lazy as _
 from .models import User
+from .utils import PremiumService
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
@@ -36,4 +37,11 @@ class UserAdmin(BaseUserAdmin):
         }),
     )
     
-    readonly_fields = ['date_joined', 'last_login']
\ No newline at end of file
+    readonly_fields = ['date_joined', 'last_login']
+    
+    # Tokens carry premium / staff claims and the premium expiry is
+    # cached - make both re-read the user
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change:
+            PremiumService.invalidate(obj.pk)
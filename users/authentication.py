@@ -0,0 +1,21 @@
+from django.conf import settings
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import user_from_claims
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that builds request.user from the token claims
+    
+    A token with current claims costs one cache read instead of a User
+    query. Tokens without claims, or issued before the user's claims
+    changed, fall back to the normal database lookup - and so does every
+    token unless JWT_CLAIMS_AUTH is on (a shared cache is configured).
+    """
+    
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN or not getattr(settings, 'JWT_CLAIMS_AUTH', False):
+            return super().get_user(validated_token)
+        return user_from_claims(validated_token) or super().get_user(validated_token)
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from users.models import User
+from users.utils import PremiumService
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Turn off is_premium for lapsed subscriptions and drop their cached entitlements'
+    
+    def handle(self, *args, **options):
+        self.stdout.write("🔍 Looking for lapsed premium subscriptions...")
+        
+        with transaction.atomic():
+            expired = User.objects.select_for_update().filter(
+                is_premium=True, premium_until__lte=timezone.now()
+            )
+            user_ids = list(expired.values_list('id', flat=True))
+            if user_ids:
+                User.objects.filter(id__in=user_ids).update(is_premium=False)
+                PremiumService.invalidate(*user_ids)
+        
+        logger.info(f"EXPIRE_PREMIUM COMPLETED - Expired: {len(user_ids)}")
+        if user_ids:
+            self.stdout.write(self.style.WARNING(f" Expired {len(user_ids)} subscription(s)"))
+        else:
+            self.stdout.write(self.style.SUCCESS(" ✅ No lapsed subscriptions"))
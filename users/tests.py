@@ -1,3 +1,162 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed
+
+from .authentication import ClaimsJWTAuthentication
+from .models import User
+from .tokens import ClaimsRefreshToken, invalidate_claims
+from .utils import PremiumService
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    JWT_CLAIMS_AUTH=True,
+)
+class ClaimsAuthenticationTests(TestCase):
+    """Tokens with current claims authenticate without a User query"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='reader@example.com', full_name='Reader',
+            is_premium=True, premium_until=timezone.now() + timedelta(days=30),
+        )
+    
+    def authenticate(self, token):
+        request = RequestFactory().get('/api/auth/test/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return ClaimsJWTAuthentication().authenticate(request)[0]
+    
+    def test_user_from_claims(self):
+        access = ClaimsRefreshToken.for_user(self.user).access_token
+        
+        with self.assertNumQueries(0):
+            user = self.authenticate(access)
+            self.assertEqual((user.id, user.email, user.full_name), (self.user.id, 'reader@example.com', 'Reader'))
+            self.assertTrue(user.is_premium_active)
+            self.assertFalse(user.is_staff)
+        
+        # Anything else is loaded on first access
+        with self.assertNumQueries(1):
+            self.assertFalse(user.email_verified)
+    
+    def test_invalidated_claims_fall_back_to_database(self):
+        access = ClaimsRefreshToken.for_user(self.user).access_token
+        User.objects.filter(pk=self.user.pk).update(is_premium=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_claims(self.user.id)
+        
+        with self.assertNumQueries(1):
+            user = self.authenticate(access)
+        self.assertFalse(user.is_premium_active)
+    
+    def test_refresh_reissues_current_claims(self):
+        refresh = ClaimsRefreshToken.for_user(self.user)
+        User.objects.filter(pk=self.user.pk).update(full_name='Renamed')
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_claims(self.user.id)
+        
+        access = ClaimsRefreshToken(str(refresh)).access_token
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate(access).full_name, 'Renamed')
+    
+    def test_deactivation_revokes_claims(self):
+        access = ClaimsRefreshToken.for_user(self.user).access_token
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete('/api/auth/delete-account/', HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(response.status_code, 200)
+        
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(access)
+    
+    def test_staff_revocation(self):
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        self.user.refresh_from_db()
+        access = ClaimsRefreshToken.for_user(self.user).access_token
+        self.assertTrue(self.authenticate(access).is_staff)
+        
+        User.objects.filter(pk=self.user.pk).update(is_staff=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            PremiumService.invalidate(self.user.id)  # What the admin does on save
+        self.assertFalse(self.authenticate(access).is_staff)
+    
+    def test_profile_update_keeps_other_columns(self):
+        access = ClaimsRefreshToken.for_user(self.user).access_token
+        # Changed after the token was issued, claims not invalidated yet
+        User.objects.filter(pk=self.user.pk).update(is_premium=False, email_verified=True)
+        
+        response = self.client.patch(
+            '/api/auth/profile/', {'full_name': 'Renamed'},
+            content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {access}',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['email_verified'])
+        
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.full_name, 'Renamed')
+        self.assertFalse(self.user.is_premium)
+    
+    @override_settings(JWT_CLAIMS_AUTH=False)
+    def test_per_process_cache_always_reads_the_user(self):
+        access = ClaimsRefreshToken.for_user(self.user).access_token
+        with self.assertNumQueries(1):
+            self.authenticate(access)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class PremiumServiceTests(TestCase):
+    """Entitlement checks are cache reads after the first lookup"""
+    
+    def setUp(self):
+        now = timezone.now()
+        self.active = User.objects.create_user(email='active@example.com', is_premium=True, premium_until=now + timedelta(days=1))
+        self.lifetime = User.objects.create_user(email='lifetime@example.com', is_premium=True)
+        self.lapsed = User.objects.create_user(email='lapsed@example.com', is_premium=True, premium_until=now - timedelta(days=1))
+        self.free = User.objects.create_user(email='free@example.com')
+        self.user_ids = [self.active.id, self.lifetime.id, self.lapsed.id, self.free.id]
+    
+    def test_bulk_lookup(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(PremiumService.premium_user_ids(self.user_ids), {self.active.id, self.lifetime.id})
+        with self.assertNumQueries(0):
+            self.assertTrue(PremiumService.is_premium(self.active.id))
+            self.assertFalse(PremiumService.is_premium(self.free.id))
+        # Expiry is checked against the cached timestamp
+        later = timezone.now() + timedelta(days=2)
+        self.assertEqual(PremiumService.premium_user_ids(self.user_ids, now=later), {self.lifetime.id})
+    
+    def test_invalidate(self):
+        self.assertFalse(PremiumService.is_premium(self.free.id))
+        User.objects.filter(pk=self.free.pk).update(is_premium=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            PremiumService.invalidate(self.free.id)
+        
+        self.assertTrue(PremiumService.is_premium(self.free.id))
+    
+    def test_invalidate_during_a_miss_wins(self):
+        real_expiry_of = PremiumService.expiry_of
+        
+        def racing_expiry_of(is_premium, premium_until):
+            # The row changes after the lookup read it, before it is cached
+            User.objects.filter(pk=self.free.pk).update(is_premium=True)
+            with self.captureOnCommitCallbacks(execute=True):
+                PremiumService.invalidate(self.free.id)
+            return real_expiry_of(is_premium, premium_until)
+        
+        with mock.patch.object(PremiumService, 'expiry_of', side_effect=racing_expiry_of):
+            self.assertFalse(PremiumService.is_premium(self.free.id))
+        
+        self.assertTrue(PremiumService.is_premium(self.free.id))
+    
+    def test_expire_premium_sweep(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('expire_premium', stdout=StringIO())
+        
+        self.assertEqual(
+            set(User.objects.filter(is_premium=True).values_list('id', flat=True)),
+            {self.active.id, self.lifetime.id},
+        )
+        self.assertFalse(PremiumService.is_premium(self.lapsed.id))
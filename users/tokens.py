@@ -0,0 +1,98 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.dateparse import parse_datetime
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from news.caching import bump, get_generations, user_generation
+from .models import User
+
+# User fields copied into every token, so most requests never load the User row
+CLAIM_FIELDS = ['email', 'full_name', 'is_premium', 'premium_until', 'is_staff']
+
+# Claims generation the token was issued under - see invalidate_claims()
+CLAIMS_VERSION_CLAIM = 'cv'
+
+
+def claims_generation(user_id):
+    return user_generation(user_id, 'claims')
+
+
+def current_claims_version(user_id):
+    name = claims_generation(user_id)
+    return get_generations([name])[name]
+
+
+def invalidate_claims(user_id):
+    """
+    Make every token issued so far for the user fall back to a database
+    lookup, once the current transaction commits. Call after changing a
+    claim field or deactivating the user.
+    """
+    bump(claims_generation(user_id))
+
+
+def user_claims(user):
+    """Claims for a token issued to user now"""
+    return {
+        'email': user.email,
+        'full_name': user.full_name,
+        'is_premium': user.is_premium,
+        'premium_until': user.premium_until.isoformat() if user.premium_until else None,
+        'is_staff': user.is_staff,
+        CLAIMS_VERSION_CLAIM: current_claims_version(user.id),
+    }
+
+
+def user_from_claims(token):
+    """
+    User built from the token's claims, or None if they are missing or stale
+    
+    Only the claim fields (plus id and is_active) are loaded; any other
+    field is deferred and read from the database on first access.
+    """
+    if any(claim not in token for claim in CLAIM_FIELDS + [CLAIMS_VERSION_CLAIM]):
+        return None
+    user_id = token[api_settings.USER_ID_CLAIM]
+    if token[CLAIMS_VERSION_CLAIM] != current_claims_version(user_id):
+        return None
+    
+    values = {
+        'id': user_id,
+        'is_active': True,  # Deactivation invalidates the claims
+        'email': token['email'],
+        'full_name': token['full_name'],
+        'is_premium': token['is_premium'],
+        'premium_until': parse_datetime(token['premium_until']) if token['premium_until'] else None,
+        'is_staff': token['is_staff'],
+    }
+    fields = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    return User.from_db(DEFAULT_DB_ALIAS, fields, [values[field] for field in fields])
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token carrying the user claims, re-read on refresh when stale"""
+    
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.payload.update(user_claims(user))
+        return token
+    
+    @property
+    def access_token(self):
+        user_id = self.payload.get(api_settings.USER_ID_CLAIM)
+        if user_id is not None and self.payload.get(CLAIMS_VERSION_CLAIM) != current_claims_version(user_id):
+            user = User.objects.filter(id=user_id, is_active=True).first()
+            if user is not None:
+                # The access token (and a rotated refresh token) copy these
+                self.payload.update(user_claims(user))
+        return super().access_token
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = ClaimsRefreshToken
@@ -1,5 +1,7 @@
 import logging
+from functools import partial
 from django.core.cache import cache
+from django.db import transaction
 from django.utils import timezone
 from datetime import timedelta
 from .models import OTP, User
@@ -7,6 +9,7 @@ from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 from django.conf import settings
+from .tokens import invalidate_claims
 logger = logging.getLogger(__name__)
 
 class EmailService:
@@ -162,4 +165,93 @@ class OTPService:
                 'user': user
             }
         
-        return {'success': False, 'message': message}
\ No newline at end of file
+        return {'success': False, 'message': message}
+
+class PremiumService:
+    """
+    Premium entitlements from a per-user cache entry
+    
+    The entry holds the premium expiry as a timestamp (0 for no premium,
+    infinity for lifetime), so checking a user costs one cache read and
+    stays correct when premium_until passes. Call invalidate() after
+    changing is_premium / premium_until.
+    
+    invalidate() leaves a short-lived tombstone instead of deleting the
+    entry, and entries are only written with cache.add(), so a reader that
+    loaded the row before the change cannot cache the old value after it.
+    """
+    NOT_PREMIUM = 0.0
+    LIFETIME = float('inf')
+    INVALIDATED = 'invalidated'
+    TOMBSTONE_TIMEOUT = 10  # Longer than a lookup's read-to-write gap
+    
+    @staticmethod
+    def cache_key(user_id):
+        return f"premium:expiry:{user_id}"
+    
+    @staticmethod
+    def timeout():
+        return getattr(settings, 'PREMIUM_CACHE_TIMEOUT', 60 * 60)
+    
+    @classmethod
+    def expiry_of(cls, is_premium, premium_until):
+        """Cache value for a user's premium fields"""
+        if not is_premium:
+            return cls.NOT_PREMIUM
+        if not premium_until:
+            return cls.LIFETIME  # Lifetime premium
+        return premium_until.timestamp()
+    
+    @classmethod
+    def expiries(cls, user_ids):
+        """{user_id: expiry timestamp} - one get_many, one query for the misses"""
+        user_ids = list(dict.fromkeys(user_ids))
+        keys = {cls.cache_key(user_id): user_id for user_id in user_ids}
+        found = {
+            keys[key]: expiry for key, expiry in cache.get_many(list(keys)).items()
+            if expiry != cls.INVALIDATED
+        }
+        
+        missing = [user_id for user_id in user_ids if user_id not in found]
+        if missing:
+            loaded = {
+                user_id: cls.expiry_of(is_premium, premium_until)
+                for user_id, is_premium, premium_until in User.objects.filter(
+                    id__in=missing
+                ).values_list('id', 'is_premium', 'premium_until')
+            }
+            # Unknown users are cached as not premium too
+            loaded = {user_id: loaded.get(user_id, cls.NOT_PREMIUM) for user_id in missing}
+            # add() never replaces a tombstone left while we were reading
+            for user_id, expiry in loaded.items():
+                cache.add(cls.cache_key(user_id), expiry, timeout=cls.timeout())
+            found.update(loaded)
+        return found
+    
+    @classmethod
+    def premium_user_ids(cls, user_ids, now=None):
+        """Which of user_ids have active premium"""
+        now = (now or timezone.now()).timestamp()
+        return {user_id for user_id, expiry in cls.expiries(user_ids).items() if expiry > now}
+    
+    @classmethod
+    def is_premium(cls, user_id, now=None):
+        """Check if one user's premium is active"""
+        return user_id in cls.premium_user_ids([user_id], now)
+    
+    @classmethod
+    def remember(cls, user):
+        """Cache the entitlement of a freshly loaded user"""
+        cache.add(
+            cls.cache_key(user.id),
+            cls.expiry_of(user.is_premium, user.premium_until),
+            timeout=cls.timeout(),
+        )
+    
+    @staticmethod
+    def invalidate(*user_ids):
+        """Forget cached entitlements (and token claims) once the transaction commits"""
+        tombstones = {PremiumService.cache_key(user_id): PremiumService.INVALIDATED for user_id in user_ids}
+        transaction.on_commit(partial(cache.set_many, tombstones, timeout=PremiumService.TOMBSTONE_TIMEOUT))
+        for user_id in user_ids:
+            invalidate_claims(user_id)
@@ -12,7 +12,8 @@ from .serializers import (
     OTPRequestSerializer, OTPVerifySerializer,
     UserSerializer
 )
-from .utils import OTPService
+from .tokens import ClaimsRefreshToken, invalidate_claims
+from .utils import OTPService, PremiumService
 
 logger = logging.getLogger(__name__)
 
@@ -91,9 +92,11 @@ def verify_otp(request):
         }, status=status.HTTP_400_BAD_REQUEST)
     
     user = result['user']
+    # Freshly loaded - warm the entitlement cache for ad gating
+    PremiumService.remember(user)
     
-    # Generate JWT tokens
-    refresh = RefreshToken.for_user(user)
+    # Generate JWT tokens (with user claims - see users/tokens.py)
+    refresh = ClaimsRefreshToken.for_user(user)
     
     # Log login
     logger.info(f"User logged in: {user.email}")
@@ -144,6 +147,18 @@ def logout(request):
 
 # ========== User Profile Views ==========
 
+def load_user(request):
+    """
+    request.user with every field loaded. A user built from token claims
+    (users/tokens.py) defers the other fields, one query each, and saving
+    it would write the token's claim values back to the row.
+    """
+    user = request.user
+    if user.get_deferred_fields():
+        user = User.objects.get(pk=user.pk)
+    return user
+
+
 @api_view(['GET', 'PUT', 'PATCH'])
 @permission_classes([IsAuthenticated])
 def profile(request):
@@ -153,8 +168,9 @@ def profile(request):
     GET  /api/auth/profile/ - Get profile
     PUT/PATCH /api/auth/profile/ - Update profile
     """
+    user = load_user(request)
     if request.method == 'GET':
-        serializer = UserSerializer(request.user)
+        serializer = UserSerializer(user)
         return Response(serializer.data)
     
     # Update profile
@@ -162,9 +178,10 @@ def profile(request):
     # Don't allow email change via this endpoint
     data.pop('email', None)
     
-    serializer = UserSerializer(request.user, data=data, partial=True)
+    serializer = UserSerializer(user, data=data, partial=True)
     if serializer.is_valid():
         serializer.save()
+        invalidate_claims(user.id)
         return Response(serializer.data)
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -180,12 +197,13 @@ def activity(request):
     
     GET /api/auth/activity/
     """
+    user = load_user(request)
     # Placeholder until voting and comments are fully implemented
     return Response({
         'total_upvotes': 0,  # Will be replaced with actual count
         'total_comments': 0,  # Will be replaced with actual count
-        'member_since': request.user.date_joined,
-        'last_active': request.user.last_login or request.user.date_joined,
+        'member_since': user.date_joined,
+        'last_active': user.last_login or user.date_joined,
     })
 
 
@@ -200,7 +218,7 @@ def change_preferences(request):
         "receive_notifications": true
     }
     """
-    user = request.user
+    user = load_user(request)
     notifications = request.data.get('receive_notifications', user.receive_notifications)
     
     user.receive_notifications = notifications
@@ -223,6 +241,7 @@ def delete_account(request):
     user = request.user
     user.is_active = False
     user.save(update_fields=['is_active'])
+    invalidate_claims(user.id)
     
     # Optional: Blacklist current refresh token
     try: